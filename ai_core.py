@@ -6,42 +6,108 @@ Questo modulo contiene la logica principale dell'AI.
 Classe Python pura per l'elaborazione intelligente.
 """
 
+import asyncio
 import os
+import re
+import sys
+import textwrap
+from collections import Counter
+from dataclasses import asdict, dataclass
 from typing import List, Dict, Optional
 from datetime import datetime
 
+# Compilati una sola volta a livello di modulo per il percorso caldo
+_WORD_RE = re.compile(r"[\w']+", re.UNICODE)
+_STOPWORDS = frozenset({
+    # Italiano
+    "il", "lo", "la", "i", "gli", "le", "un", "uno", "una", "di", "a", "da",
+    "in", "con", "su", "per", "tra", "fra", "e", "o", "ma", "che", "non",
+    "come", "più", "del", "della", "dei", "delle", "al", "alla", "è", "sono",
+    # Inglese
+    "the", "a", "an", "of", "to", "in", "on", "for", "and", "or", "but",
+    "is", "are", "was", "were", "be", "this", "that", "with", "as", "it",
+})
+
+try:
+    from app.services.semantic_cache import SemanticCache
+except Exception:  # Redis/config non disponibili in modalità standalone
+    SemanticCache = None
+
+
+@dataclass(slots=True)
+class Message:
+    """
+    Singolo messaggio della conversazione.
+
+    Dataclass con slots: ~metà della memoria di un dict per messaggio,
+    importante per le cronologie lunghe tenute in session state.
+    """
+    role: str
+    content: str
+    timestamp: str
+
 
 class VeritasAI:
     """
     Classe principale per l'intelligenza artificiale di Veritas Pro.
     Gestisce analisi, ragionamento e generazione di risposte.
     """
-    
-    def __init__(self, model_name: str = "gpt-4", temperature: float = 0.7):
+
+    __slots__ = (
+        "model_name",
+        "temperature",
+        "conversation_history",
+        "system_prompt",
+        "semantic_cache",
+        "_user_count",
+        "_ai_count",
+    )
+
+    # Prompt di sistema: costante di classe interned, condivisa tra tutte
+    # le istanze (una per sessione Streamlit) invece di una copia ciascuna
+    _SYSTEM_PROMPT = sys.intern(textwrap.dedent("""
+        Sei Veritas, un assistente AI professionale e preciso.
+        Il tuo obiettivo è fornire risposte accurate, verificabili e utili.
+        Mantieni sempre un tono professionale ma amichevole.
+    """).strip())
+
+
+    def __init__(self, model_name: str = "gpt-4", temperature: float = 0.7,
+                 use_semantic_cache: bool = True):
         """
         Inizializza il cervello AI.
-        
+
         Args:
             model_name: Nome del modello AI da utilizzare
             temperature: Creatività delle risposte (0.0-1.0)
+            use_semantic_cache: Abilita la cache semantica su Redis
         """
         self.model_name = model_name
         self.temperature = temperature
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history: List[Message] = []
         self.system_prompt = self._load_system_prompt()
+
+        # Contatori mantenuti incrementalmente: get_stats resta O(1)
+        # anche su conversazioni lunghe (chiamata ad ogni rerun Streamlit)
+        self._user_count = 0
+        self._ai_count = 0
+
+        # Cache semantica: risposte per prompt simili servite da Redis
+        self.semantic_cache = None
+        if use_semantic_cache and SemanticCache is not None:
+            try:
+                self.semantic_cache = SemanticCache()
+            except Exception:
+                self.semantic_cache = None
         
     def _load_system_prompt(self) -> str:
         """
         Carica il prompt di sistema che definisce il comportamento dell'AI.
-        
+
         Returns:
-            Il prompt di sistema
-        """
-        return """
-        Sei Veritas, un assistente AI professionale e preciso.
-        Il tuo obiettivo è fornire risposte accurate, verificabili e utili.
-        Mantieni sempre un tono professionale ma amichevole.
+            Il prompt di sistema (costante di classe condivisa)
         """
+        return self._SYSTEM_PROMPT
     
     def analyze(self, input_text: str) -> Dict[str, any]:
         """
@@ -53,28 +119,33 @@ class VeritasAI:
         Returns:
             Dizionario contenente l'analisi e la risposta
         """
+        # Timestamp calcolato una sola volta e riutilizzato
+        timestamp = datetime.now().isoformat()
+
         # Aggiungi alla cronologia
-        self.conversation_history.append({
-            "role": "user",
-            "content": input_text,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.conversation_history.append(Message("user", input_text, timestamp))
+        self._user_count += 1
         
-        # Simula l'analisi (qui integrerai la vera API)
-        response = self._generate_response(input_text)
+        # Controlla la cache semantica prima di chiamare il modello
+        response = None
+        if self.semantic_cache:
+            response = self.semantic_cache.get(input_text)
+
+        if response is None:
+            # Simula l'analisi (qui integrerai la vera API)
+            response = self._generate_response(input_text)
+            if self.semantic_cache:
+                self.semantic_cache.set(input_text, response)
         
         # Aggiungi risposta alla cronologia
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": response,
-            "timestamp": datetime.now().isoformat()
-        })
-        
+        self.conversation_history.append(Message("assistant", response, timestamp))
+        self._ai_count += 1
+
         return {
             "input": input_text,
             "response": response,
             "confidence": 0.95,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
     
     def _generate_response(self, input_text: str) -> str:
@@ -95,13 +166,15 @@ class VeritasAI:
         Restituisce la cronologia della conversazione.
         
         Returns:
-            Lista di messaggi nella conversazione
+            Lista di messaggi nella conversazione (dict per compatibilità)
         """
-        return self.conversation_history
+        return [asdict(m) for m in self.conversation_history]
     
     def clear_history(self) -> None:
         """Pulisce la cronologia della conversazione."""
         self.conversation_history = []
+        self._user_count = 0
+        self._ai_count = 0
     
     def set_temperature(self, temperature: float) -> None:
         """
@@ -126,8 +199,8 @@ class VeritasAI:
             "total_messages": len(self.conversation_history),
             "model": self.model_name,
             "temperature": self.temperature,
-            "user_messages": len([m for m in self.conversation_history if m["role"] == "user"]),
-            "ai_messages": len([m for m in self.conversation_history if m["role"] == "assistant"])
+            "user_messages": self._user_count,
+            "ai_messages": self._ai_count
         }
 
 
@@ -158,18 +231,42 @@ class VeritasAnalyzer:
     def extract_keywords(text: str, top_n: int = 5) -> List[str]:
         """
         Estrae le parole chiave da un testo.
-        
+
+        Singola passata O(N) con regex precompilata e Counter:
+        risultato deterministico, ordinato per frequenza.
+
         Args:
             text: Testo da analizzare
             top_n: Numero di keywords da estrarre
-            
+
         Returns:
-            Lista di keywords
+            Lista di keywords ordinate per frequenza
         """
-        # Placeholder per estrazione keywords
-        words = text.lower().split()
-        return list(set(words))[:top_n]
-    
+        counts = Counter(
+            w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS
+        )
+        return [word for word, _ in counts.most_common(top_n)]
+
+    @classmethod
+    async def analyze_all(cls, text: str, top_n: int = 5) -> tuple:
+        """
+        Esegue sentiment e keywords in parallelo.
+
+        La latenza diventa max(sentiment, keywords) invece della somma:
+        conta quando i placeholder verranno sostituiti da modelli reali.
+
+        Args:
+            text: Testo da analizzare
+            top_n: Numero di keywords da estrarre
+
+        Returns:
+            Tupla (sentiment, keywords)
+        """
+        return await asyncio.gather(
+            asyncio.to_thread(cls.sentiment_analysis, text),
+            asyncio.to_thread(cls.extract_keywords, text, top_n),
+        )
+
     @staticmethod
     def summarize(text: str, max_length: int = 100) -> str:
         """
@@ -5,10 +5,11 @@ La Faccia del Sistema
 Interfaccia utente moderna e interattiva costruita con Streamlit.
 """
 
+import asyncio
+
 import streamlit as st
 from ai_core import VeritasAI, VeritasAnalyzer
 from datetime import datetime
-import time
 
 
 # Configurazione della pagina
@@ -19,8 +20,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS personalizzato per un look premium
-st.markdown("""
+# Numero massimo di messaggi renderizzati inline nella chat
+MAX_RENDERED_MESSAGES = 50
+
+# CSS personalizzato per un look premium (costante di modulo, emesso una volta)
+_CSS = """
 <style>
     /* Tema principale */
     .main {
@@ -93,7 +97,11 @@ st.markdown("""
         box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit ri-esegue lo script ad ogni interazione e rende solo ciò che
+# la run corrente emette: il CSS va quindi emesso ad ogni rerun
+st.markdown(_CSS, unsafe_allow_html=True)
 
 
 def initialize_session_state():
@@ -162,16 +170,20 @@ def render_chat_interface():
     
     # Container per i messaggi
     chat_container = st.container()
-    
-    # Mostra messaggi esistenti
+
+    # Mostra solo la coda recente: il costo di rerender resta O(50)
+    # anche su conversazioni lunghe
     with chat_container:
-        for message in st.session_state.messages:
-            if message['role'] == 'user':
-                st.markdown(f'<div class="user-message">👤 **Tu:** {message["content"]}</div>', 
-                          unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="ai-message">🧠 **Veritas:** {message["content"]}</div>', 
-                          unsafe_allow_html=True)
+        messages = st.session_state.messages
+        older = messages[:-MAX_RENDERED_MESSAGES]
+        if older:
+            with st.expander(f"💬 Messaggi precedenti ({len(older)})"):
+                for message in older:
+                    with st.chat_message(message['role']):
+                        st.markdown(message['content'])
+        for message in messages[-MAX_RENDERED_MESSAGES:]:
+            with st.chat_message(message['role']):
+                st.markdown(message['content'])
     
     # Input utente
     st.markdown("---")
@@ -200,7 +212,6 @@ def render_chat_interface():
         
         # Ottieni risposta AI
         with st.spinner("🤔 Veritas sta pensando..."):
-            time.sleep(0.5)  # Effetto di attesa
             result = st.session_state.ai.analyze(user_input)
         
         # Aggiungi risposta AI
@@ -215,17 +226,18 @@ def render_chat_interface():
     # Gestione analisi avanzata
     if analyze_button and user_input:
         st.markdown("### 🔬 Analisi Avanzata")
-        
+
+        # Sentiment e keywords calcolati in parallelo
+        sentiment, keywords = asyncio.run(VeritasAnalyzer.analyze_all(user_input))
+
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.markdown("#### Sentiment")
-            sentiment = st.session_state.analyzer.sentiment_analysis(user_input)
             st.json(sentiment)
-        
+
         with col2:
             st.markdown("#### Keywords")
-            keywords = st.session_state.analyzer.extract_keywords(user_input)
             st.write(", ".join(keywords))
 
 
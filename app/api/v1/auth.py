@@ -4,7 +4,7 @@ User registration and login endpoints.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.schemas.auth import UserCreate, LoginRequest, TokenResponse
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=TokenResponse, status_code=201)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new user.
@@ -28,13 +28,13 @@ async def register(
     Returns JWT access token and user information.
     """
     auth_service = AuthService(db)
-    return auth_service.register_user(user_data)
+    return await auth_service.register_user(user_data)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Authenticate user and get JWT token.
@@ -45,4 +45,4 @@ async def login(
     Returns JWT access token for subsequent authenticated requests.
     """
     auth_service = AuthService(db)
-    return auth_service.login(credentials.email, credentials.password)
+    return await auth_service.login(credentials.email, credentials.password)
@@ -3,25 +3,56 @@ Chat API Endpoints
 RAG-based chat query and history endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import hashlib
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from typing import Optional
 
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.database import SessionLocal, get_db
+from app.core.security import CurrentUser, get_current_user
 from app.schemas.chat import ChatQuery, ChatResponse, ChatHistoryList, ChatHistoryItem, SourceDocument
 from app.services.chat_service import get_chat_service
 from app.repositories.chat_repository import ChatRepository
+from app.utils.logger import logger
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
+async def _persist_history(
+    user_id: int, query: str, response: str, sources: list
+) -> None:
+    """
+    Write a chat history row in the background.
+
+    Runs after the response is sent; the request-scoped session is
+    already torn down by then, so open a dedicated one.
+
+    Args:
+        user_id: Owner user ID
+        query: User's question
+        response: Generated answer
+        sources: Source documents used
+    """
+    try:
+        async with SessionLocal() as session:
+            await ChatRepository(session).create(
+                user_id=user_id,
+                query=query,
+                response=response,
+                sources=sources
+            )
+    except Exception as e:
+        logger.error(f"Error saving chat history in background: {e}")
+
+
 @router.post("/query", response_model=ChatResponse)
 async def query_chat(
     query: ChatQuery,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Ask a question to the AI assistant.
@@ -40,31 +71,24 @@ async def query_chat(
     chat_service = get_chat_service()
     
     # Get response from chat service
-    response_text, sources, cached = chat_service.query(query.query)
+    response_text, sources, cached = await chat_service.query(query.query)
     
-    # Save to chat history (if not cached)
+    # Save to chat history (if not cached) after the response is sent —
+    # the DB write no longer sits on the request's critical path. sources
+    # already carry the repo-ready shape (document_id, filename,
+    # relevance_score)
     if not cached:
-        chat_repo = ChatRepository(db)
-        chat_repo.create(
-            user_id=current_user.id,
-            query=query.query,
-            response=response_text,
-            sources=[{
-                "document_id": s["document_id"],
-                "filename": s["filename"],
-                "relevance_score": s["relevance_score"]
-            } for s in sources]
-        )
-    
-    # Format sources for response
-    source_docs = [
-        SourceDocument(
-            document_id=s["document_id"],
-            filename=s["filename"],
-            relevance_score=s["relevance_score"]
+        background_tasks.add_task(
+            _persist_history,
+            current_user.id,
+            query.query,
+            response_text,
+            sources
         )
-        for s in sources
-    ]
+
+    # Format sources for response; model_construct skips validation since
+    # the fields come from our own retriever and are already typed
+    source_docs = [SourceDocument.model_construct(**s) for s in sources]
     
     return ChatResponse(
         query=query.query,
@@ -75,32 +99,88 @@ async def query_chat(
     )
 
 
+@router.post("/stream")
+async def stream_chat(
+    query: ChatQuery,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Ask a question to the AI assistant, streaming the answer.
+
+    Same RAG pipeline as `/query`, but response tokens are forwarded to
+    the client as Ollama produces them instead of buffering the full
+    generation — time-to-first-byte drops from seconds to milliseconds.
+
+    Cache hits arrive as a single chunk.
+
+    **Requires authentication.**
+    """
+    chat_service = get_chat_service()
+    chunks, sources, cached = await chat_service.stream_query(query.query)
+
+    async def event_stream():
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        # Persist only streams that finished cleanly: a client disconnect
+        # unwinds the generator at the yield (an await in finally can't
+        # complete there) and a mid-stream error must not record a
+        # truncated transcript as a real exchange
+        full_response = "".join(parts)
+        if full_response and not cached:
+            await _persist_history(
+                current_user.id, query.query, full_response, sources
+            )
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get("/history", response_model=ChatHistoryList)
 async def get_chat_history(
+    request: Request,
+    response: Response,
     limit: int = 50,
-    offset: int = 0,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    before_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get chat history for the current user.
-    
+
     - **limit**: Maximum number of entries (default 50)
-    - **offset**: Number of entries to skip (for pagination)
-    
-    Returns chat history ordered by most recent first.
-    
+    - **before_id**: Keyset cursor; pass the next_cursor of the previous page
+
+    Returns chat history ordered by most recent first. Fetching limit+1
+    rows makes has_more free — no COUNT query per page.
+
     **Requires authentication.**
     """
     chat_repo = ChatRepository(db)
-    history = chat_repo.get_history_by_user(
+    rows = await chat_repo.get_history_by_user(
         user_id=current_user.id,
         limit=limit,
-        offset=offset
+        before_id=before_id
     )
-    
+    has_more = len(rows) > limit
+    history = rows[:limit]
+
+    # History only grows, so the newest id + page size identify the page;
+    # matching If-None-Match skips serialization entirely
+    newest_id = history[0].id if history else 0
+    etag = hashlib.blake2b(
+        f"{newest_id}:{len(history)}:{limit}:{before_id}".encode(), digest_size=8
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, max-age=5"
+
+    # model_construct skips re-validation: these rows come straight from
+    # our own table and are already the right types
     history_items = [
-        ChatHistoryItem(
+        ChatHistoryItem.model_construct(
             id=chat.id,
             query=chat.query,
             response=chat.response,
@@ -109,8 +189,9 @@ async def get_chat_history(
         )
         for chat in history
     ]
-    
+
     return ChatHistoryList(
         history=history_items,
-        total=len(history_items)
+        next_cursor=history[-1].id if has_more else None,
+        has_more=has_more
     )
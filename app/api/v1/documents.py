@@ -3,13 +3,14 @@ Document API Endpoints
 Document upload and retrieval endpoints.
 """
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
+import hashlib
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, UploadFile, File, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.security import CurrentUser, get_current_user
 from app.schemas.document import DocumentUpload, DocumentResponse, DocumentList
 from app.services.document_service import DocumentService
 from app.repositories.document_repository import DocumentRepository
@@ -17,63 +18,94 @@ from app.repositories.document_repository import DocumentRepository
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 
-@router.post("/upload", response_model=DocumentUpload, status_code=201)
+@router.post("/upload", response_model=DocumentUpload, status_code=202)
 async def upload_document(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a document (PDF or TXT).
-    
+
     The document will be:
     1. Validated for size and format
     2. Text extracted
     3. Stored in database
-    4. Indexed for RAG retrieval
-    
+    4. Indexed for RAG retrieval in the background
+
+    Returns 202 once the document is stored; indexing completes
+    asynchronously and fills in embedding_id.
+
     **Requires authentication.**
     """
     doc_service = DocumentService(db)
-    document = await doc_service.upload_document(file, current_user.id)
-    
+    document = await doc_service.upload_document(
+        file,
+        current_user.id,
+        background_tasks,
+        content_length=int(request.headers.get("content-length") or 0),
+    )
+
     return DocumentUpload(
         id=document.id,
         filename=document.filename,
         user_id=document.user_id,
         created_at=document.created_at,
-        message="Document uploaded and indexed successfully"
+        message="Document uploaded; indexing in progress"
     )
 
 
 @router.get("", response_model=DocumentList)
 async def get_documents(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = 50,
+    after_id: int = 0,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all documents for the current user.
-    
-    Returns list of uploaded documents with metadata.
-    
+    Get documents for the current user.
+
+    - **limit**: Maximum number of documents per page (default 50)
+    - **after_id**: Keyset cursor; pass the last id of the previous page
+
+    Returns a page of uploaded documents with metadata, ordered by id.
+    Supports conditional requests via ETag/If-None-Match.
+
     **Requires authentication.**
     """
     doc_repo = DocumentRepository(db)
-    documents = doc_repo.get_all_by_user(current_user.id)
-    
-    # Add content preview
-    doc_responses = []
-    for doc in documents:
-        preview = doc.content[:200] + "..." if len(doc.content) > 200 else doc.content
-        doc_responses.append(
-            DocumentResponse(
-                id=doc.id,
-                filename=doc.filename,
-                user_id=doc.user_id,
-                created_at=doc.created_at,
-                content_preview=preview
-            )
+    documents = await doc_repo.get_all_by_user(
+        current_user.id, limit=limit, after_id=after_id
+    )
+
+    # The listing only changes when a document is added/removed, so an
+    # ETag over (newest timestamp, count, page) lets repeat polls return
+    # 304 without rebuilding the response
+    max_created_at = max((d.created_at for d in documents), default=None)
+    etag = hashlib.blake2b(
+        f"{max_created_at}:{len(documents)}:{limit}:{after_id}".encode(),
+        digest_size=8
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, max-age=5"
+
+    # model_construct skips re-validation of trusted ORM rows
+    doc_responses = [
+        DocumentResponse.model_construct(
+            id=doc.id,
+            filename=doc.filename,
+            user_id=doc.user_id,
+            created_at=doc.created_at,
+            content_preview=doc.content_preview
         )
+        for doc in documents
+    ]
     
     return DocumentList(
         documents=doc_responses,
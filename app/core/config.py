@@ -1,78 +1,158 @@
 """
 Configuration Management
-Centralized settings using Pydantic BaseSettings for environment-based configuration.
+Environment parsing via Pydantic BaseSettings, snapshotted into an
+immutable dataclass for cheap hot-path attribute access.
 """
 
+from dataclasses import dataclass
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Tuple
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
     """
     Application settings loaded from environment variables.
-    
+
     All sensitive data (API keys, secrets) should be stored in .env file.
+    Used only for env parsing at startup; the rest of the app reads the
+    frozen snapshot below.
     """
-    
+
     # Application
     APP_NAME: str = "AI Knowledge Assistant"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     API_V1_PREFIX: str = "/api/v1"
-    
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
-    
+
     # Database
     DATABASE_URL: str
     DATABASE_ECHO: bool = False
-    
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_ENABLED: bool = True
     CACHE_TTL: int = 3600  # 1 hour
-    
+
+    # Semantic response cache
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # Min cosine similarity for a hit
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1024
+
     # Ollama (Local AI)
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "llama3.2"
     OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"
     OLLAMA_TEMPERATURE: float = 0.3  # Low temperature for factual responses
     OLLAMA_MAX_TOKENS: int = 1000
-    
+    OLLAMA_MAX_CONCURRENCY: int = 10  # Parallel embedding requests (fallback path)
+
     # RAG Configuration
-    CHUNK_SIZE: int = 1000
-    CHUNK_OVERLAP: int = 200
+    CHUNK_SIZE: int = 1000  # Characters (fallback splitter)
+    CHUNK_OVERLAP: int = 200  # Characters (fallback splitter)
+    CHUNK_SIZE_TOKENS: int = 250  # Tokens (~1000 chars) for the tiktoken splitter
+    CHUNK_OVERLAP_TOKENS: int = 50  # Tokens of overlap for the tiktoken splitter
     TOP_K_RESULTS: int = 3  # Number of similar chunks to retrieve
-    
+
+    # FAISS index tuning
+    FAISS_INDEX_TYPE: str = "flat"  # flat | hnsw | ivf
+    FAISS_NPROBE: int = 16  # IVF cells probed per query (recall/latency knob)
+    FAISS_QUANTIZER: str = "none"  # none | fp16 | pq (memory vs. exactness)
+    FAISS_IVF_TRAIN_SIZE: int = 30720  # Vectors buffered before training (30*nlist)
+    FAISS_SNAPSHOT_EVERY: int = 500  # Chunks added between index snapshots
+    FAISS_USE_GPU: bool = False  # Move the index to GPU 0 (needs faiss-gpu)
+    FAISS_MIN_ROWS: int = 256  # Below this, search is a direct SIMD matmul
+
+    # Embedding cache
+    EMBEDDING_CACHE_DIR: str = "embedding_cache"  # Per-model chunk-hash cache
+
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10 MB
     ALLOWED_EXTENSIONS: list = [".pdf", ".txt"]
-    
+
     # CORS
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8000"]
-    
+
     class Config:
         env_file = ".env"
         case_sensitive = True
         extra = "ignore"  # Ignore extra environment variables
 
 
+@dataclass(frozen=True, slots=True)
+class FrozenSettings:
+    """
+    Immutable settings snapshot used throughout the application.
+
+    Frozen slots dataclass: attribute reads are C-level slot lookups
+    (faster than Pydantic's __getattr__ on hot paths), mutable list
+    defaults become tuples, and accidental runtime mutation is impossible.
+    """
+
+    APP_NAME: str
+    APP_VERSION: str
+    DEBUG: bool
+    API_V1_PREFIX: str
+    SECRET_KEY: str
+    ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int
+    DATABASE_URL: str
+    DATABASE_ECHO: bool
+    REDIS_HOST: str
+    REDIS_PORT: int
+    REDIS_DB: int
+    REDIS_ENABLED: bool
+    CACHE_TTL: int
+    SEMANTIC_CACHE_ENABLED: bool
+    SEMANTIC_CACHE_THRESHOLD: float
+    SEMANTIC_CACHE_MAX_ENTRIES: int
+    OLLAMA_BASE_URL: str
+    OLLAMA_MODEL: str
+    OLLAMA_EMBEDDING_MODEL: str
+    OLLAMA_TEMPERATURE: float
+    OLLAMA_MAX_TOKENS: int
+    OLLAMA_MAX_CONCURRENCY: int
+    CHUNK_SIZE: int
+    CHUNK_OVERLAP: int
+    CHUNK_SIZE_TOKENS: int
+    CHUNK_OVERLAP_TOKENS: int
+    TOP_K_RESULTS: int
+    FAISS_INDEX_TYPE: str
+    FAISS_NPROBE: int
+    FAISS_QUANTIZER: str
+    FAISS_IVF_TRAIN_SIZE: int
+    FAISS_SNAPSHOT_EVERY: int
+    FAISS_USE_GPU: bool
+    FAISS_MIN_ROWS: int
+    EMBEDDING_CACHE_DIR: str
+    MAX_FILE_SIZE: int
+    ALLOWED_EXTENSIONS: Tuple[str, ...]
+    CORS_ORIGINS: Tuple[str, ...]
+
+
 @lru_cache()
-def get_settings() -> Settings:
+def get_settings() -> FrozenSettings:
     """
     Get cached settings instance.
-    
-    Using lru_cache ensures settings are loaded only once.
-    
+
+    Environment is parsed once at process start and snapshotted into the
+    frozen dataclass.
+
     Returns:
-        Settings: Application settings
+        FrozenSettings: Application settings
     """
-    return Settings()
+    data = Settings().model_dump()
+    # Lowercased tuple so validation is a single C-level str.endswith call
+    data["ALLOWED_EXTENSIONS"] = tuple(ext.lower() for ext in data["ALLOWED_EXTENSIONS"])
+    data["CORS_ORIGINS"] = tuple(data["CORS_ORIGINS"])
+    return FrozenSettings(**data)
 
 
 # Export settings instance
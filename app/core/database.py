@@ -1,59 +1,82 @@
 """
 Database Configuration
-SQLAlchemy setup with PostgreSQL connection and session management.
+Async SQLAlchemy setup with asyncpg driver and session management.
 """
 
 from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from typing import AsyncGenerator
 
 from app.core.config import settings
 
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
+def _async_database_url(url: str) -> str:
+    """
+    Rewrite a database URL to use the async driver.
+
+    Args:
+        url: Configured DATABASE_URL (sync driver form)
+
+    Returns:
+        str: URL with asyncpg/aiosqlite driver
+    """
+    if url.startswith("postgresql+asyncpg://") or url.startswith("sqlite+aiosqlite://"):
+        return url
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+# Async engine: endpoints are async def, so DB I/O must not block the event loop
+engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
     echo=settings.DATABASE_ECHO,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,
-    max_overflow=20
+    pool_size=20,
+    max_overflow=10  # Burst headroom before callers queue for a connection
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session factory; expire_on_commit=False so objects stay usable after commit
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+# Sync engine used only for table creation at startup
+sync_engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    pool_pre_ping=True
+)
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency to get database session.
-    
+    Dependency to get async database session.
+
     Yields:
-        Session: SQLAlchemy database session
-        
+        AsyncSession: SQLAlchemy async database session
+
     Usage:
         @app.get("/items")
-        def get_items(db: Session = Depends(get_db)):
+        async def get_items(db: AsyncSession = Depends(get_db)):
             ...
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def init_db() -> None:
     """
     Initialize database tables.
-    
+
     Creates all tables defined in models.
     Should be called on application startup.
     """
     # Import all models here to ensure they are registered
     from app.models import user, document, chat
-    
-    Base.metadata.create_all(bind=engine)
+
+    Base.metadata.create_all(bind=sync_engine)
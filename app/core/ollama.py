@@ -0,0 +1,141 @@
+"""
+Ollama HTTP Client
+Shared application-scoped httpx client for Ollama generate/embed calls.
+"""
+
+from typing import AsyncIterator, List
+
+import httpx
+import orjson
+
+from app.core.config import settings
+
+
+# One client for the whole process: keep-alive connections avoid paying
+# TCP/TLS setup per call, and HTTP/2 multiplexes concurrent requests
+# over a single connection.
+_client = httpx.AsyncClient(
+    base_url=settings.OLLAMA_BASE_URL,
+    http2=True,
+    timeout=httpx.Timeout(300.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+)
+
+
+# The model/options part of the generate body never changes at runtime;
+# serialize it once and splice only the prompt in per request (the [:-1]
+# drops the closing brace so the prompt field can be appended)
+_GENERATE_BODY_PREFIX = orjson.dumps({
+    "model": settings.OLLAMA_MODEL,
+    "stream": False,
+    "options": {
+        "temperature": settings.OLLAMA_TEMPERATURE,
+        "num_predict": settings.OLLAMA_MAX_TOKENS
+    }
+})[:-1]
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared Ollama HTTP client.
+
+    Returns:
+        httpx.AsyncClient: Application-scoped client
+    """
+    return _client
+
+
+async def generate(prompt: str, **options) -> str:
+    """
+    Generate a completion from the configured Ollama model.
+
+    Args:
+        prompt: Full prompt text
+        **options: Extra Ollama generation options (temperature, num_predict...)
+
+    Returns:
+        str: Generated response text
+    """
+    if options:
+        response = await _client.post(
+            "/api/generate",
+            json={
+                "model": settings.OLLAMA_MODEL,
+                "prompt": prompt,
+                "stream": False,
+                "options": options
+            }
+        )
+    else:
+        # Default options: splice the prompt into the pre-serialized body
+        body = b"".join(
+            (_GENERATE_BODY_PREFIX, b',"prompt":', orjson.dumps(prompt), b"}")
+        )
+        response = await _client.post(
+            "/api/generate", content=body, headers=_JSON_HEADERS
+        )
+    response.raise_for_status()
+    return orjson.loads(response.content)["response"].strip()
+
+
+async def generate_stream(prompt: str, **options) -> AsyncIterator[str]:
+    """
+    Stream a completion from the configured Ollama model token by token.
+
+    Args:
+        prompt: Full prompt text
+        **options: Extra Ollama generation options (temperature, num_predict...)
+
+    Yields:
+        str: Response text fragments as Ollama produces them
+    """
+    async with _client.stream(
+        "POST",
+        "/api/generate",
+        json={
+            "model": settings.OLLAMA_MODEL,
+            "prompt": prompt,
+            "stream": True,
+            "options": options or {
+                "temperature": settings.OLLAMA_TEMPERATURE,
+                "num_predict": settings.OLLAMA_MAX_TOKENS
+            }
+        }
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+
+
+async def embed(texts: List[str]) -> List[List[float]]:
+    """
+    Embed a batch of texts with the configured embedding model.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        List of embedding vectors, one per input text
+    """
+    response = await _client.post(
+        "/api/embed",
+        json={
+            "model": settings.OLLAMA_EMBEDDING_MODEL,
+            "input": texts
+        }
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["embeddings"]
+
+
+async def aclose() -> None:
+    """Close the shared client; call from application shutdown."""
+    await _client.aclose()
@@ -3,13 +3,17 @@ Security Utilities
 JWT token handling, password hashing, and authentication dependencies.
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+
+import xxhash
+from cachetools import TTLCache
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
@@ -22,6 +26,26 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """
+    Lightweight authenticated-user snapshot handed to endpoints.
+
+    Deliberately not the ORM object: it carries no session binding, so
+    it can be cached across requests safely.
+    """
+
+    id: int
+    email: str
+    role: str
+
+
+# token -> CurrentUser. Short TTL bounds the window in which a revoked
+# or role-changed user is still served from cache; within it, repeat
+# requests skip both the JWT decode and the user SELECT.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
 def hash_password(password: str) -> str:
     """
     Hash a plain password using bcrypt.
@@ -99,44 +123,54 @@ def decode_access_token(token: str) -> Dict[str, Any]:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """
     Dependency to get current authenticated user from JWT token.
-    
+
+    Resolution is cached per token for a short TTL, so most authenticated
+    requests skip the JWT decode and the user SELECT entirely.
+
     Args:
         credentials: HTTP Bearer credentials
-        db: Database session
-        
+        db: Async database session
+
     Returns:
-        User: Current authenticated user
-        
+        CurrentUser: Current authenticated user snapshot
+
     Raises:
         HTTPException: If authentication fails
     """
     # Import here to avoid circular import
     from app.repositories.user_repository import UserRepository
-    
+
     token = credentials.credentials
+    cache_key = xxhash.xxh3_64_hexdigest(token)
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     payload = decode_access_token(token)
-    
+
     user_id: Optional[int] = payload.get("sub")
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
-    
+
     user_repo = UserRepository(db)
-    user = user_repo.get_by_id(int(user_id))
-    
+    user = await user_repo.get_by_id(int(user_id))
+
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    
-    return user
+
+    current = CurrentUser(id=user.id, email=user.email, role=user.role)
+    _token_cache[cache_key] = current
+    return current
 
 
 async def get_current_admin_user(current_user = Depends(get_current_user)):
@@ -3,14 +3,26 @@ AI Knowledge Assistant - Main Application
 FastAPI application with RAG-based document Q&A system.
 """
 
+import os
+
+# Pin BLAS/OpenMP to one thread per call BEFORE numpy/faiss are imported:
+# with many concurrent small searches, oversubscribed thread pools thrash
+# the CPU and add latency instead of removing it.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+import faiss
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
+from app.core import ollama
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1 import auth, documents, chat
+from app.services.rag_service import close_rag_service
 from app.utils.logger import logger
 
 
@@ -25,7 +37,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting AI Knowledge Assistant...")
     logger.info(f"Environment: {'DEBUG' if settings.DEBUG else 'PRODUCTION'}")
-    
+
+    # Belt and braces with the env vars above: cap FAISS's own OpenMP
+    # pool so per-query searches stay single-threaded under concurrency
+    try:
+        faiss.omp_set_num_threads(1)
+    except AttributeError:
+        pass  # Some FAISS builds ship without OpenMP bindings
+
+
     # Initialize database
     try:
         init_db()
@@ -38,6 +58,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down AI Knowledge Assistant...")
+    await ollama.aclose()
+    close_rag_service()
 
 
 # Create FastAPI application
@@ -74,6 +96,7 @@ app = FastAPI(
     """,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -94,7 +117,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     Global exception handler for unhandled errors.
     """
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
@@ -3,9 +3,8 @@ Chat History Model
 Stores conversation history between users and the AI assistant.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, ForeignKey, JSON, func, text
 from sqlalchemy.orm import relationship
-from datetime import datetime
 
 from app.core.database import Base
 
@@ -25,13 +24,19 @@ class ChatHistory(Base):
     """
     
     __tablename__ = "chat_history"
+
+    # Composite index matching the hot query shape: the history listing
+    # filters by user and keyset-paginates on id DESC
+    __table_args__ = (
+        Index("ix_chat_user_id", "user_id", text("id DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     query = Column(Text, nullable=False)
     response = Column(Text, nullable=False)
     sources = Column(JSON, nullable=True)  # List of document IDs used for context
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="chat_history")
@@ -3,9 +3,8 @@ Document Model
 Represents uploaded documents with their content and embeddings.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
-from datetime import datetime
 
 from app.core.database import Base
 
@@ -18,6 +17,7 @@ class Document(Base):
         id: Primary key
         filename: Original filename
         content: Extracted text content
+        content_preview: Short preview materialized at upload time
         user_id: Foreign key to owner
         embedding_id: Reference to vector store embedding
         created_at: Upload timestamp
@@ -25,13 +25,18 @@ class Document(Base):
     """
     
     __tablename__ = "documents"
-    
+
+    # get_all_by_user filters on user_id; without this the lookup is a
+    # full-table scan as the documents table grows
+    __table_args__ = (Index("ix_docs_user", "user_id"),)
+
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     content = Column(Text, nullable=False)
+    content_preview = Column(String(220), nullable=True)  # First 200 chars, computed at upload
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     embedding_id = Column(String, nullable=True)  # FAISS index reference
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     owner = relationship("User", back_populates="documents")
@@ -4,8 +4,8 @@ Data access layer for ChatHistory model operations.
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.chat import ChatHistory
 
@@ -14,17 +14,17 @@ class ChatRepository:
     """
     Repository pattern for ChatHistory database operations.
     """
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         """
         Initialize repository with database session.
-        
+
         Args:
-            db: SQLAlchemy database session
+            db: SQLAlchemy async database session
         """
         self.db = db
-    
-    def create(
+
+    async def create(
         self,
         user_id: int,
         query: str,
@@ -33,13 +33,13 @@ class ChatRepository:
     ) -> ChatHistory:
         """
         Create a new chat history entry.
-        
+
         Args:
             user_id: User ID
             query: User's question
             response: AI's answer
             sources: Optional list of source documents
-            
+
         Returns:
             Created ChatHistory object
         """
@@ -50,61 +50,64 @@ class ChatRepository:
             sources=sources or []
         )
         self.db.add(chat)
-        self.db.commit()
-        self.db.refresh(chat)
+        await self.db.commit()
+        await self.db.refresh(chat)
         return chat
-    
-    def get_by_id(self, chat_id: int) -> Optional[ChatHistory]:
+
+    async def get_by_id(self, chat_id: int) -> Optional[ChatHistory]:
         """
         Get chat history entry by ID.
-        
+
         Args:
             chat_id: Chat history ID
-            
+
         Returns:
             ChatHistory object or None
         """
-        return self.db.query(ChatHistory).filter(ChatHistory.id == chat_id).first()
-    
-    def get_history_by_user(
+        # Identity-map lookup: skips the SELECT when already loaded
+        return await self.db.get(ChatHistory, chat_id)
+
+    async def get_history_by_user(
         self,
         user_id: int,
         limit: int = 50,
-        offset: int = 0
+        before_id: Optional[int] = None
     ) -> List[ChatHistory]:
         """
-        Get chat history for a specific user.
-        
+        Get chat history for a specific user, keyset-paginated.
+
+        Fetches limit+1 rows so the caller can tell whether another page
+        exists without a separate COUNT query.
+
         Args:
             user_id: User ID
             limit: Maximum number of entries to return
-            offset: Number of entries to skip
-            
+            before_id: Keyset cursor; return entries with id below this
+
         Returns:
-            List of ChatHistory objects ordered by most recent first
+            Up to limit+1 ChatHistory objects ordered by most recent first
         """
-        return (
-            self.db.query(ChatHistory)
-            .filter(ChatHistory.user_id == user_id)
-            .order_by(desc(ChatHistory.created_at))
-            .limit(limit)
-            .offset(offset)
-            .all()
+        stmt = select(ChatHistory).where(ChatHistory.user_id == user_id)
+        if before_id is not None:
+            stmt = stmt.where(ChatHistory.id < before_id)
+        result = await self.db.execute(
+            stmt.order_by(desc(ChatHistory.id)).limit(limit + 1)
         )
-    
-    def delete(self, chat_id: int) -> bool:
+        return list(result.scalars().all())
+
+    async def delete(self, chat_id: int) -> bool:
         """
         Delete a chat history entry.
-        
+
         Args:
             chat_id: Chat history ID
-            
+
         Returns:
             True if deleted, False if not found
         """
-        chat = self.get_by_id(chat_id)
+        chat = await self.get_by_id(chat_id)
         if chat:
-            self.db.delete(chat)
-            self.db.commit()
+            await self.db.delete(chat)
+            await self.db.commit()
             return True
         return False
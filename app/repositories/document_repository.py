@@ -4,7 +4,9 @@ Data access layer for Document model operations.
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from app.models.document import Document
 
@@ -13,32 +15,34 @@ class DocumentRepository:
     """
     Repository pattern for Document database operations.
     """
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         """
         Initialize repository with database session.
-        
+
         Args:
-            db: SQLAlchemy database session
+            db: SQLAlchemy async database session
         """
         self.db = db
-    
-    def create(
+
+    async def create(
         self,
         filename: str,
         content: str,
         user_id: int,
+        content_preview: Optional[str] = None,
         embedding_id: Optional[str] = None
     ) -> Document:
         """
         Create a new document.
-        
+
         Args:
             filename: Original filename
             content: Extracted text content
             user_id: Owner user ID
+            content_preview: Optional pre-computed content preview
             embedding_id: Optional FAISS embedding reference
-            
+
         Returns:
             Created Document object
         """
@@ -46,59 +50,95 @@ class DocumentRepository:
             filename=filename,
             content=content,
             user_id=user_id,
+            content_preview=content_preview,
             embedding_id=embedding_id
         )
         self.db.add(document)
-        self.db.commit()
-        self.db.refresh(document)
+        await self.db.commit()
+        await self.db.refresh(document)
         return document
-    
-    def get_by_id(self, document_id: int) -> Optional[Document]:
+
+    async def get_by_id(self, document_id: int) -> Optional[Document]:
         """
         Get document by ID.
-        
+
         Args:
             document_id: Document ID
-            
+
         Returns:
             Document object or None
         """
-        return self.db.query(Document).filter(Document.id == document_id).first()
-    
-    def get_all_by_user(self, user_id: int) -> List[Document]:
+        # Identity-map lookup: skips the SELECT when already loaded
+        return await self.db.get(Document, document_id)
+
+    async def get_all_by_user(
+        self,
+        user_id: int,
+        limit: int = 50,
+        after_id: int = 0
+    ) -> List[Document]:
         """
-        Get all documents for a specific user.
-        
+        Get documents for a specific user, keyset-paginated.
+
         Args:
             user_id: User ID
-            
+            limit: Maximum number of documents to return
+            after_id: Return documents with id greater than this (cursor)
+
         Returns:
-            List of Document objects
+            List of Document objects ordered by id (content column not loaded)
         """
-        return self.db.query(Document).filter(Document.user_id == user_id).all()
-    
-    def get_all(self) -> List[Document]:
+        # Keyset pagination (id > cursor) stays O(limit) however large the
+        # table grows, unlike OFFSET which still scans the skipped rows.
+        # load_only keeps the full content blob out of the listing query;
+        # only the lightweight metadata columns cross the wire
+        result = await self.db.execute(
+            select(Document)
+            .where(Document.user_id == user_id, Document.id > after_id)
+            .order_by(Document.id)
+            .limit(limit)
+            .options(load_only(
+                Document.id,
+                Document.filename,
+                Document.user_id,
+                Document.created_at,
+                Document.content_preview
+            ))
+        )
+        return list(result.scalars().all())
+
+    async def get_all(self, limit: int = 100, after_id: int = 0) -> List[Document]:
         """
-        Get all documents (admin only).
-        
+        Get all documents (admin only), keyset-paginated.
+
+        Args:
+            limit: Maximum number of documents to return
+            after_id: Return documents with id greater than this (cursor)
+
         Returns:
-            List of all Document objects
+            List of Document objects ordered by id
         """
-        return self.db.query(Document).all()
-    
-    def delete(self, document_id: int) -> bool:
+        result = await self.db.execute(
+            select(Document)
+            .where(Document.id > after_id)
+            .order_by(Document.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def delete(self, document_id: int) -> bool:
         """
         Delete a document by ID.
-        
+
         Args:
             document_id: Document ID
-            
+
         Returns:
             True if deleted, False if not found
         """
-        document = self.get_by_id(document_id)
+        document = await self.get_by_id(document_id)
         if document:
-            self.db.delete(document)
-            self.db.commit()
+            await self.db.delete(document)
+            await self.db.commit()
             return True
         return False
@@ -3,8 +3,12 @@ User Repository
 Data access layer for User model operations.
 """
 
+import asyncio
+
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.core.security import hash_password
@@ -13,79 +17,113 @@ from app.core.security import hash_password
 class UserRepository:
     """
     Repository pattern for User database operations.
-    
+
     Separates data access logic from business logic.
     """
-    
-    def __init__(self, db: Session):
+
+    def __init__(self, db: AsyncSession):
         """
         Initialize repository with database session.
-        
+
         Args:
-            db: SQLAlchemy database session
+            db: SQLAlchemy async database session
         """
         self.db = db
-    
-    def get_by_id(self, user_id: int) -> Optional[User]:
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
         """
         Get user by ID.
-        
+
         Args:
             user_id: User ID
-            
+
         Returns:
             User object or None if not found
         """
-        return self.db.query(User).filter(User.id == user_id).first()
-    
-    def get_by_email(self, email: str) -> Optional[User]:
+        # Session.get checks the identity map first: no SQL at all if the
+        # object is already loaded, and a compiled-once PK lookup otherwise
+        return await self.db.get(User, user_id)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
         """
         Get user by email address.
-        
+
         Args:
             email: User email
-            
+
         Returns:
             User object or None if not found
         """
-        return self.db.query(User).filter(User.email == email).first()
-    
-    def create(self, email: str, password: str, role: str = "user") -> User:
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalar_one_or_none()
+
+    async def create(self, email: str, password: str, role: str = "user") -> User:
         """
         Create a new user.
-        
+
         Args:
             email: User email
             password: Plain text password (will be hashed)
             role: User role (default: "user")
-            
+
         Returns:
             Created User object
         """
-        hashed_password = hash_password(password)
+        # bcrypt costs ~200ms of pure CPU; run it in a worker thread so
+        # the event loop keeps serving other requests meanwhile
+        hashed_password = await asyncio.to_thread(hash_password, password)
         user = User(
             email=email,
             hashed_password=hashed_password,
             role=role
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
-    
-    def delete(self, user_id: int) -> bool:
+
+    async def create_if_absent(
+        self, email: str, password: str, role: str = "user"
+    ) -> Optional[User]:
+        """
+        Create a user unless the email is already taken, in one statement.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING, so the uniqueness check
+        and the insert are a single round trip with no race window
+        between them.
+
+        Args:
+            email: User email
+            password: Plain text password (will be hashed)
+            role: User role (default: "user")
+
+        Returns:
+            Created User object, or None if the email already exists
+        """
+        hashed_password = await asyncio.to_thread(hash_password, password)
+        result = await self.db.execute(
+            pg_insert(User)
+            .values(email=email, hashed_password=hashed_password, role=role)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User)
+        )
+        user = result.scalar_one_or_none()
+        await self.db.commit()
+        return user
+
+    async def delete(self, user_id: int) -> bool:
         """
         Delete a user by ID.
-        
+
         Args:
             user_id: User ID to delete
-            
+
         Returns:
             True if deleted, False if not found
         """
-        user = self.get_by_id(user_id)
+        user = await self.get_by_id(user_id)
         if user:
-            self.db.delete(user)
-            self.db.commit()
+            await self.db.delete(user)
+            await self.db.commit()
             return True
         return False
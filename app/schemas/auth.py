@@ -3,7 +3,7 @@ Authentication Schemas
 Pydantic models for authentication requests and responses.
 """
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
@@ -36,6 +36,5 @@ class UserResponse(BaseModel):
     email: str
     role: str
     created_at: datetime
-    
-    class Config:
-        from_attributes = True  # Pydantic v2 (was orm_mode in v1)
+
+    model_config = ConfigDict(from_attributes=True)
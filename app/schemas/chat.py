@@ -3,7 +3,7 @@ Chat Schemas
 Pydantic models for chat queries and responses.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, List
 
@@ -36,12 +36,12 @@ class ChatHistoryItem(BaseModel):
     response: str
     sources: Optional[List[dict]] = None
     created_at: datetime
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChatHistoryList(BaseModel):
     """Schema for chat history list"""
     history: List[ChatHistoryItem]
-    total: int
+    next_cursor: Optional[int] = Field(None, description="Pass as before_id to fetch the next page")
+    has_more: bool = Field(default=False, description="Whether older entries exist")
@@ -3,7 +3,7 @@ Document Schemas
 Pydantic models for document upload and retrieval.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 
@@ -24,9 +24,8 @@ class DocumentResponse(BaseModel):
     user_id: int
     created_at: datetime
     content_preview: Optional[str] = Field(None, description="First 200 characters of content")
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DocumentList(BaseModel):
@@ -3,9 +3,11 @@ Authentication Service
 Business logic for user authentication and JWT token management.
 """
 
+import asyncio
+
 from datetime import timedelta
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.user_repository import UserRepository
 from app.core.security import verify_password, create_access_token
@@ -18,17 +20,17 @@ class AuthService:
     Service for authentication operations.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Initialize auth service.
         
         Args:
-            db: Database session
+            db: Async database session
         """
         self.db = db
         self.user_repo = UserRepository(db)
     
-    def register_user(self, user_data: UserCreate) -> TokenResponse:
+    async def register_user(self, user_data: UserCreate) -> TokenResponse:
         """
         Register a new user.
         
@@ -41,21 +43,19 @@ class AuthService:
         Raises:
             HTTPException: If email already exists
         """
-        # Check if user already exists
-        existing_user = self.user_repo.get_by_email(user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        # Create user
-        user = self.user_repo.create(
+        # Single INSERT ... ON CONFLICT: one round trip instead of a
+        # SELECT-then-INSERT, and no race between the check and the insert
+        user = await self.user_repo.create_if_absent(
             email=user_data.email,
             password=user_data.password,
             role=user_data.role or "user"
         )
-        
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+
         logger.info(f"New user registered: {user.email}")
         
         # Generate JWT token
@@ -69,7 +69,7 @@ class AuthService:
             role=user.role
         )
     
-    def login(self, email: str, password: str) -> TokenResponse:
+    async def login(self, email: str, password: str) -> TokenResponse:
         """
         Authenticate user and generate JWT token.
         
@@ -84,7 +84,7 @@ class AuthService:
             HTTPException: If credentials are invalid
         """
         # Get user by email
-        user = self.user_repo.get_by_email(email)
+        user = await self.user_repo.get_by_email(email)
         
         if not user:
             raise HTTPException(
@@ -92,8 +92,12 @@ class AuthService:
                 detail="Invalid email or password"
             )
         
-        # Verify password
-        if not verify_password(password, user.hashed_password):
+        # Verify password in a worker thread: bcrypt is CPU-bound and
+        # would otherwise serialize concurrent logins on the event loop
+        valid = await asyncio.to_thread(
+            verify_password, password, user.hashed_password
+        )
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -3,17 +3,39 @@ Chat Service with Ollama
 Orchestrates RAG-based chat functionality with Ollama and Redis caching.
 """
 
-import json
-import hashlib
-from typing import Optional, Tuple, List
-import requests
-import redis
+import asyncio
+from typing import AsyncIterator, Optional, Tuple, List
 
+import faiss
+import numpy as np
+import orjson
+import redis.asyncio as aioredis
+import xxhash
+from cachetools import TTLCache
+
+from app.core import ollama
 from app.core.config import settings
 from app.services.rag_service import get_rag_service
 from app.utils.logger import logger
 
 
+# Static prompt segments built once at import; per-request assembly is a
+# single "".join instead of re-copying the full instruction block
+_PROMPT_PREFIX = """You are an AI assistant that answers questions based ONLY on the provided context from uploaded documents.
+
+CRITICAL RULES:
+1. Answer ONLY using information from the context below
+2. If the context doesn't contain relevant information, say "I don't have enough information in the uploaded documents to answer this question."
+3. Do NOT use external knowledge or make assumptions
+4. Cite specific parts of the context when answering
+5. Be concise and accurate
+
+CONTEXT FROM DOCUMENTS:
+"""
+_PROMPT_MIDDLE = "\n\nUSER QUESTION:\n"
+_PROMPT_SUFFIX = "\n\nANSWER:"
+
+
 class ChatService:
     """
     Chat service that combines RAG retrieval with Ollama chat completion.
@@ -27,22 +49,33 @@ class ChatService:
         self.model = settings.OLLAMA_MODEL
         self.rag_service = get_rag_service()
         
-        # Initialize Redis cache if enabled
-        self.redis_client: Optional[redis.Redis] = None
+        # Initialize async Redis cache if enabled; the connection is only
+        # verified lazily on first use so startup never blocks on Redis
+        self.redis_client: Optional[aioredis.Redis] = None
+        self._redis_verified = False
         if settings.REDIS_ENABLED:
-            try:
-                self.redis_client = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    db=settings.REDIS_DB,
-                    decode_responses=True
-                )
-                self.redis_client.ping()
-                logger.info("Connected to Redis cache")
-            except Exception as e:
-                logger.warning(f"Redis connection failed: {e}. Caching disabled.")
-                self.redis_client = None
-    
+            self.redis_client = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                decode_responses=False,  # orjson works on raw bytes
+                max_connections=50
+            )
+
+        # L1 in-process cache in front of Redis: hot queries skip the
+        # network round trip entirely; Redis stays the shared L2 so
+        # other workers still see cached entries
+        self._l1: TTLCache = TTLCache(maxsize=1024, ttl=settings.CACHE_TTL)
+
+        # Semantic cache: cosine search over recent query embeddings, so
+        # near-duplicate phrasings hit without an exact string match
+        self._semantic_index = faiss.IndexFlatIP(self.rag_service.dimension)
+        self._semantic_entries: List[dict] = []
+
+        # Single-flight map: identical queries arriving while the first
+        # is still generating await its future instead of re-generating
+        self._inflight: dict = {}
+
     def _get_cache_key(self, query: str) -> str:
         """
         Generate cache key for a query.
@@ -53,9 +86,86 @@ class ChatService:
         Returns:
             str: Cache key (hash of query)
         """
-        return f"chat:{hashlib.md5(query.encode()).hexdigest()}"
+        # xxh3 is an order of magnitude faster than MD5 and a cache key
+        # needs no cryptographic strength; it also hashes str directly
+        return f"chat:{xxhash.xxh3_64_hexdigest(query)}"
     
-    def _get_cached_response(self, query: str) -> Optional[dict]:
+    async def _semantic_lookup(self, query: str) -> Tuple[Optional[np.ndarray], Optional[dict]]:
+        """
+        Look up a cached response for a semantically similar query.
+
+        Args:
+            query: User query
+
+        Returns:
+            Tuple of (normalized query embedding, cached response or None)
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None, None
+
+        try:
+            embedding = await asyncio.to_thread(self.rag_service._get_embedding, query)
+        except Exception as e:
+            logger.error("Error embedding query for semantic cache: %s", e)
+            return None, None
+
+        vector = embedding.reshape(1, -1).astype('float32')
+        faiss.normalize_L2(vector)
+
+        if self._semantic_index.ntotal > 0:
+            scores, indices = self._semantic_index.search(vector, 1)
+            if scores[0][0] >= settings.SEMANTIC_CACHE_THRESHOLD:
+                logger.info("Semantic cache hit (similarity=%.3f)", scores[0][0])
+                return vector, self._semantic_entries[indices[0][0]]
+
+        return vector, None
+
+    def _semantic_store(self, vector: Optional[np.ndarray], response: dict) -> None:
+        """
+        Store a response under its query embedding, evicting oldest entries.
+
+        Args:
+            vector: Normalized query embedding (None skips storing)
+            response: Response dict to cache
+        """
+        if vector is None or not settings.SEMANTIC_CACHE_ENABLED:
+            return
+
+        if len(self._semantic_entries) >= settings.SEMANTIC_CACHE_MAX_ENTRIES:
+            # Drop the older half and rebuild the flat index
+            keep = settings.SEMANTIC_CACHE_MAX_ENTRIES // 2
+            self._semantic_entries = self._semantic_entries[-keep:]
+            self._semantic_index.reset()
+            self._semantic_index.add(
+                np.vstack([e["vector"] for e in self._semantic_entries])
+            )
+
+        self._semantic_entries.append({**response, "vector": vector})
+        self._semantic_index.add(vector)
+
+    async def _ensure_redis(self) -> bool:
+        """
+        Verify the Redis connection once, disabling caching on failure.
+
+        Returns:
+            bool: True if Redis is usable
+        """
+        if not self.redis_client:
+            return False
+        if self._redis_verified:
+            return True
+
+        try:
+            await self.redis_client.ping()
+            self._redis_verified = True
+            logger.info("Connected to Redis cache")
+            return True
+        except Exception as e:
+            logger.warning("Redis connection failed: %s. Caching disabled.", e)
+            self.redis_client = None
+            return False
+
+    async def _get_cached_response(self, query: str) -> Optional[dict]:
         """
         Get cached response for a query.
         
@@ -65,21 +175,30 @@ class ChatService:
         Returns:
             dict: Cached response or None
         """
-        if not self.redis_client:
+        cache_key = self._get_cache_key(query)
+
+        # L1 first: in-process, no RTT
+        hit = self._l1.get(cache_key)
+        if hit is not None:
+            logger.info("L1 cache hit for query: %.50s...", query)
+            return hit
+
+        if not await self._ensure_redis():
             return None
         
         try:
-            cache_key = self._get_cache_key(query)
-            cached = self.redis_client.get(cache_key)
+            cached = await self.redis_client.get(cache_key)
             if cached:
-                logger.info(f"Cache hit for query: {query[:50]}...")
-                return json.loads(cached)
+                logger.info("Cache hit for query: %.50s...", query)
+                data = orjson.loads(cached)
+                self._l1[cache_key] = data  # promote to L1
+                return data
         except Exception as e:
-            logger.error(f"Error reading from cache: {e}")
+            logger.error("Error reading from cache: %s", e)
         
         return None
     
-    def _cache_response(self, query: str, response: dict) -> None:
+    async def _cache_response(self, query: str, response: dict) -> None:
         """
         Cache a response.
         
@@ -87,19 +206,21 @@ class ChatService:
             query: User query
             response: Response to cache
         """
-        if not self.redis_client:
+        cache_key = self._get_cache_key(query)
+        self._l1[cache_key] = response
+
+        if not await self._ensure_redis():
             return
         
         try:
-            cache_key = self._get_cache_key(query)
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 cache_key,
                 settings.CACHE_TTL,
-                json.dumps(response)
+                orjson.dumps(response)
             )
-            logger.info(f"Cached response for query: {query[:50]}...")
+            logger.info("Cached response for query: %.50s...", query)
         except Exception as e:
-            logger.error(f"Error writing to cache: {e}")
+            logger.error("Error writing to cache: %s", e)
     
     def _build_prompt(self, query: str, context: str) -> str:
         """
@@ -112,26 +233,11 @@ class ChatService:
         Returns:
             str: Formatted prompt
         """
-        prompt = f"""You are an AI assistant that answers questions based ONLY on the provided context from uploaded documents.
-
-CRITICAL RULES:
-1. Answer ONLY using information from the context below
-2. If the context doesn't contain relevant information, say "I don't have enough information in the uploaded documents to answer this question."
-3. Do NOT use external knowledge or make assumptions
-4. Cite specific parts of the context when answering
-5. Be concise and accurate
-
-CONTEXT FROM DOCUMENTS:
-{context}
-
-USER QUESTION:
-{query}
-
-ANSWER:"""
-        
-        return prompt
+        return "".join(
+            (_PROMPT_PREFIX, context, _PROMPT_MIDDLE, query, _PROMPT_SUFFIX)
+        )
     
-    def query(self, user_query: str) -> Tuple[str, List[dict], bool]:
+    async def query(self, user_query: str) -> Tuple[str, List[dict], bool]:
         """
         Process a user query using RAG.
         
@@ -141,52 +247,149 @@ ANSWER:"""
         Returns:
             Tuple of (response, sources, cached)
         """
-        logger.info(f"Processing query: {user_query[:100]}...")
-        
-        # Check cache first
-        cached = self._get_cached_response(user_query)
+        logger.info("Processing query: %.100s...", user_query)
+
+        # Check exact-match cache first
+        cached = await self._get_cached_response(user_query)
         if cached:
             return cached["response"], cached["sources"], True
-        
-        # Get relevant context from documents
-        context, sources = self.rag_service.get_context_for_query(user_query)
-        
+
+        # Single-flight: if the same query is already generating, await
+        # its result — N duplicate misses cost exactly one generation
+        cache_key = self._get_cache_key(user_query)
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            logger.info("Coalescing duplicate in-flight query: %.50s...", user_query)
+            response, sources = await asyncio.shield(inflight)
+            return response, sources, True
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response, sources = await self._execute_query(user_query)
+            future.set_result((response, sources))
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+        return response, sources, False
+
+    async def _execute_query(self, user_query: str) -> Tuple[str, List[dict]]:
+        """
+        Run the full RAG pipeline for a cache-miss query.
+
+        Args:
+            user_query: User's question
+
+        Returns:
+            Tuple of (response, sources)
+        """
+        # Semantic cache: catches re-phrasings the hashed key misses
+        query_vector, semantic_hit = await self._semantic_lookup(user_query)
+        if semantic_hit:
+            return semantic_hit["response"], semantic_hit["sources"]
+
+        # Get relevant context from documents (coalesced with any
+        # concurrent queries into a single batched retrieval)
+        context, sources = await self.rag_service.get_context_batched(user_query)
+
         if not context:
             response = "I don't have any documents to answer your question. Please upload some documents first."
-            return response, [], False
-        
+            return response, []
+
         # Build prompt with context
         prompt = self._build_prompt(user_query, context)
         
-        # Get response from Ollama
+        # Get response from Ollama over the shared keep-alive client;
+        # awaiting lets the event loop serve other requests meanwhile
         try:
-            response_data = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": settings.OLLAMA_TEMPERATURE,
-                        "num_predict": settings.OLLAMA_MAX_TOKENS
-                    }
-                }
-            )
-            response_data.raise_for_status()
-            
-            response = response_data.json()["response"].strip()
+            response = await ollama.generate(prompt)
             logger.info("Successfully generated response from Ollama")
-            
         except Exception as e:
-            logger.error(f"Error calling Ollama API: {e}")
-            response = f"Error generating response: {str(e)}"
-            sources = []
-        
+            # Never cache the error path: a transient outage would be
+            # served as a complete answer (and to similar queries via
+            # the semantic cache) for the full TTL
+            logger.error("Error calling Ollama API: %s", e)
+            return f"Error generating response: {str(e)}", []
+
         # Cache the response
         cache_data = {"response": response, "sources": sources}
-        self._cache_response(user_query, cache_data)
-        
-        return response, sources, False
+        await self._cache_response(user_query, cache_data)
+        self._semantic_store(query_vector, cache_data)
+
+        return response, sources
+
+    async def stream_query(
+        self, user_query: str
+    ) -> Tuple[AsyncIterator[str], List[dict], bool]:
+        """
+        Process a user query using RAG, streaming the response.
+
+        Cache hits are replayed as a single chunk; otherwise tokens are
+        forwarded from Ollama as they arrive and the full response is
+        cached once the stream completes.
+
+        Args:
+            user_query: User's question
+
+        Returns:
+            Tuple of (chunk_iterator, sources, cached)
+        """
+        logger.info("Processing streaming query: %.100s...", user_query)
+
+        cached = await self._get_cached_response(user_query)
+        if cached:
+            return self._replay(cached["response"]), cached["sources"], True
+
+        query_vector, semantic_hit = await self._semantic_lookup(user_query)
+        if semantic_hit:
+            return self._replay(semantic_hit["response"]), semantic_hit["sources"], True
+
+        context, sources = await self.rag_service.get_context_batched(user_query)
+
+        if not context:
+            response = "I don't have any documents to answer your question. Please upload some documents first."
+            return self._replay(response), [], False
+
+        prompt = self._build_prompt(user_query, context)
+
+        async def _generate() -> AsyncIterator[str]:
+            parts: List[str] = []
+            try:
+                async for chunk in ollama.generate_stream(prompt):
+                    parts.append(chunk)
+                    yield chunk
+            except Exception as e:
+                logger.error("Error streaming from Ollama API: %s", e)
+                yield f"Error generating response: {str(e)}"
+                return
+
+            # Only cache streams that finished cleanly: a mid-stream
+            # error returns above, and a client disconnect raises
+            # GeneratorExit at the yield, so a truncated answer is never
+            # stored as if it were complete
+            full_response = "".join(parts)
+            if full_response:
+                cache_data = {"response": full_response, "sources": sources}
+                await self._cache_response(user_query, cache_data)
+                self._semantic_store(query_vector, cache_data)
+
+        return _generate(), sources, False
+
+    @staticmethod
+    async def _replay(response: str) -> AsyncIterator[str]:
+        """
+        Wrap an already-complete response as a one-chunk stream.
+
+        Args:
+            response: Full response text
+
+        Yields:
+            str: The response as a single chunk
+        """
+        yield response
 
 
 # Singleton instance
@@ -3,9 +3,13 @@ Document Service
 Business logic for document upload and processing.
 """
 
-from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Optional
 
+from fastapi import BackgroundTasks, UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal
 from app.repositories.document_repository import DocumentRepository
 from app.services.rag_service import get_rag_service
 from app.utils.text_extractor import extract_text_from_file
@@ -18,51 +22,64 @@ class DocumentService:
     Service for handling document upload and indexing.
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """
         Initialize document service.
         
         Args:
-            db: Database session
+            db: Async database session
         """
         self.db = db
         self.doc_repo = DocumentRepository(db)
         self.rag_service = get_rag_service()
     
-    async def upload_document(self, file: UploadFile, user_id: int):
+    async def upload_document(
+        self,
+        file: UploadFile,
+        user_id: int,
+        background_tasks: BackgroundTasks,
+        content_length: Optional[int] = None,
+    ):
         """
-        Upload and index a document.
-        
+        Upload a document and schedule its indexing in the background.
+
+        The response returns as soon as the row is persisted; chunking
+        and embedding (seconds to minutes for large PDFs) run after the
+        response, and embedding_id is filled in once indexing completes.
+
         Args:
             file: Uploaded file
             user_id: Owner user ID
-            
+            background_tasks: FastAPI background task queue
+            content_length: Declared request body size, if the client sent one
+
         Returns:
-            Document: Created document object
-            
+            Document: Created document object (embedding_id still pending)
+
         Raises:
             HTTPException: If file validation or processing fails
         """
-        # Validate file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
-        
-        if file_size > settings.MAX_FILE_SIZE:
+        # Reject oversize uploads from the declared size before reading a
+        # single body byte; the fstat check while spooling to disk stays
+        # as the backstop for clients that lie or send no length
+        declared = content_length or file.size or 0
+        if declared > settings.MAX_FILE_SIZE:
             raise HTTPException(
                 status_code=413,
                 detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE / 1024 / 1024}MB"
             )
-        
+
         # Validate file extension
         filename = file.filename.lower()
-        if not any(filename.endswith(ext) for ext in settings.ALLOWED_EXTENSIONS):
+        # str.endswith with a tuple runs the suffix scan in C instead of
+        # a Python-level generator per upload
+        if not filename.endswith(settings.ALLOWED_EXTENSIONS):
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid file type. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}"
             )
         
-        logger.info(f"Processing document upload: {file.filename} for user {user_id}")
+        logger.info("Processing document upload: %s for user %d", file.filename, user_id)
         
         # Extract text content
         content = await extract_text_from_file(file)
@@ -73,33 +90,52 @@ class DocumentService:
                 detail="Document content is too short or empty"
             )
         
-        # Save document to database
-        document = self.doc_repo.create(
+        # Save document to database with the preview materialized once
+        preview = content[:200] + "..." if len(content) > 200 else content
+        document = await self.doc_repo.create(
             filename=file.filename,
             content=content,
-            user_id=user_id
+            user_id=user_id,
+            content_preview=preview
         )
         
-        # Index document for RAG
+        # Index for RAG after the response is sent; the ASGI worker is
+        # no longer pinned for the duration of chunking + embedding
+        background_tasks.add_task(
+            self._index_in_background, document.id, document.filename, content
+        )
+
+        logger.info("Uploaded document, indexing scheduled: %s", file.filename)
+        return document
+
+    async def _index_in_background(
+        self, document_id: int, filename: str, content: str
+    ) -> None:
+        """
+        Index a document and record its embedding_id.
+
+        Runs as a background task after the upload response; uses a
+        dedicated session since the request-scoped one is already closed.
+        Failures only log — the document row stays with a null
+        embedding_id, signalling indexing didn't complete.
+
+        Args:
+            document_id: Database document ID
+            filename: Document filename
+            content: Extracted text content
+        """
         try:
-            embedding_id = self.rag_service.index_document(
-                document_id=document.id,
-                filename=document.filename,
-                content=content
+            embedding_id = await asyncio.to_thread(
+                self.rag_service.index_document,
+                document_id,
+                filename,
+                content
             )
-            
-            # Update document with embedding ID
-            document.embedding_id = embedding_id
-            self.db.commit()
-            
-            logger.info(f"Successfully uploaded and indexed document: {file.filename}")
-            
+            async with SessionLocal() as session:
+                document = await DocumentRepository(session).get_by_id(document_id)
+                if document:
+                    document.embedding_id = embedding_id
+                    await session.commit()
+            logger.info("Successfully indexed document in background: %s", filename)
         except Exception as e:
-            logger.error(f"Error indexing document: {e}")
-            # Document is saved but not indexed - could be handled differently
-            raise HTTPException(
-                status_code=500,
-                detail=f"Document saved but indexing failed: {str(e)}"
-            )
-        
-        return document
+            logger.error("Error indexing document %s in background: %s", filename, e)
@@ -3,17 +3,96 @@ RAG Service with Ollama
 Retrieval-Augmented Generation implementation using FAISS and Ollama embeddings.
 """
 
+import asyncio
+import hashlib
 import os
 import pickle
+import threading
+from array import array
 from typing import List, Tuple, Optional
 import faiss
+import httpx
 import numpy as np
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import requests
+import orjson
 
 from app.core.config import settings
+from app.services.chunking import split_text
 from app.utils.logger import logger
 
+# Hand-tuned AVX-512/NEON cosine kernels for the tiny-corpus fast path;
+# a plain BLAS matmul covers the same path when it's not installed
+try:
+    import simsimd
+    _SIMSIMD = True
+except ImportError:
+    _SIMSIMD = False
+
+
+class _ChunkStore:
+    """
+    Structure-of-arrays store for chunk metadata.
+
+    Instead of one dict (four boxed objects plus hash table) per chunk,
+    columns live in compact C arrays and filenames are dictionary-encoded
+    so each repeated name is stored once. Rows are materialized as dicts
+    only at the tiny top-k result boundary.
+    """
+
+    __slots__ = (
+        "_document_ids", "_chunk_indices", "_filename_refs",
+        "_contents", "_filenames", "_filename_ids",
+    )
+
+    def __init__(self):
+        self._document_ids = array('i')
+        self._chunk_indices = array('i')
+        self._filename_refs = array('i')
+        self._contents: List[str] = []
+        self._filenames: List[str] = []
+        self._filename_ids: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def __getitem__(self, idx: int) -> dict:
+        """Materialize one chunk row as a dict."""
+        return {
+            "document_id": self._document_ids[idx],
+            "filename": self._filenames[self._filename_refs[idx]],
+            "chunk_index": self._chunk_indices[idx],
+            "content": self._contents[idx],
+        }
+
+    def extend(self, chunks: List[dict]) -> None:
+        """
+        Append a batch of chunk rows; O(new chunks).
+
+        Args:
+            chunks: Metadata dicts with document_id/filename/chunk_index/content
+        """
+        for chunk in chunks:
+            filename = chunk["filename"]
+            ref = self._filename_ids.get(filename)
+            if ref is None:
+                ref = len(self._filenames)
+                self._filenames.append(filename)
+                self._filename_ids[filename] = ref
+            self._document_ids.append(chunk["document_id"])
+            self._chunk_indices.append(chunk["chunk_index"])
+            self._filename_refs.append(ref)
+            self._contents.append(chunk["content"])
+
+    def take(self, indices: List[int]) -> List[dict]:
+        """Materialize several rows at once (batch fetch for search results)."""
+        return [self[i] for i in indices]
+
+    def truncate(self, size: int) -> None:
+        """Drop rows beyond size (crash-recovery trim)."""
+        del self._document_ids[size:]
+        del self._chunk_indices[size:]
+        del self._filename_refs[size:]
+        del self._contents[size:]
+
 
 class RAGService:
     """
@@ -26,52 +105,364 @@ class RAGService:
         """Initialize RAG service with Ollama client and FAISS index."""
         self.ollama_url = settings.OLLAMA_BASE_URL
         self.embedding_model = settings.OLLAMA_EMBEDDING_MODEL
-        self.index: Optional[faiss.IndexFlatL2] = None
-        self.documents: List[dict] = []  # Store document chunks with metadata
+        self.index: Optional[faiss.Index] = None
+        self.documents = _ChunkStore()  # Chunk metadata, columnar
         self.dimension = 768  # nomic-embed-text dimension
-        
-        # Text splitter for chunking
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP,
-            length_function=len,
+        self._train_buffer: List[np.ndarray] = []  # Pre-training IVF buffer
+        self._snapshot_size = 0  # Document count at the last index snapshot
+        self._gpu_resources = None  # Keeps GPU scratch memory alive
+        self._on_gpu = False
+        self._mat: Optional[np.ndarray] = None  # Small-corpus vector matrix
+
+        # Serializes index/metadata mutation and keeps index.add away
+        # from concurrent index.search (FAISS supports neither): indexing
+        # jobs run on worker threads, so two overlapping uploads could
+        # otherwise interleave vector adds and metadata appends and
+        # permanently misalign FAISS positions with chunk metadata
+        self._index_lock = threading.Lock()
+
+        # Micro-batching for retrieval: concurrent queries arriving within
+        # the batch window share one embed call and one FAISS search
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batcher_task: Optional[asyncio.Task] = None
+
+        # On-disk embedding cache, partitioned per model so a model swap
+        # never serves stale vectors
+        self._embedding_cache_dir = os.path.join(
+            settings.EMBEDDING_CACHE_DIR, self.embedding_model
         )
-        
+        os.makedirs(self._embedding_cache_dir, exist_ok=True)
+
+        # Persistent HTTP/2 client: embedding calls reuse warm keep-alive
+        # connections instead of paying TCP setup per chunk, and HTTP/2
+        # multiplexes concurrent requests over one connection
+        self._http = httpx.Client(
+            base_url=self.ollama_url,
+            http2=True,
+            timeout=httpx.Timeout(300.0, connect=10.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=40,
+                max_connections=100,
+                keepalive_expiry=30.0
+            )
+        )
+
         # Try to load existing index
         self._load_index()
-    
+        self._maybe_to_gpu()
+
+    _INDEX_PATH = "faiss_index.bin"
+    _DOCS_PATH = "faiss_documents.jsonl"
+    _LEGACY_DOCS_PATH = "faiss_documents.pkl"
+
+    _MAX_BATCH_SIZE = 8
+    _MAX_BATCH_WAIT = 0.01  # seconds to wait for companions before flushing
+
+    def close(self) -> None:
+        """Flush a final snapshot and close the HTTP pool on shutdown."""
+        with self._index_lock:
+            if len(self.documents) != self._snapshot_size:
+                self._snapshot_index()
+        self._http.close()
+
+    def _load_metadata(self) -> _ChunkStore:
+        """
+        Load chunk metadata, preferring the append-only JSONL store.
+
+        A legacy pickle is read once and converted to JSONL. Rows stream
+        straight into the columnar store without keeping a list of dicts
+        for the whole corpus alive.
+
+        Returns:
+            _ChunkStore: Columnar chunk metadata store
+        """
+        store = _ChunkStore()
+        if os.path.exists(self._DOCS_PATH):
+            with open(self._DOCS_PATH, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        store.extend([orjson.loads(line)])
+            return store
+
+        with open(self._LEGACY_DOCS_PATH, 'rb') as f:
+            documents = pickle.load(f)
+        with open(self._DOCS_PATH, 'wb') as f:
+            f.writelines(orjson.dumps(doc) + b"\n" for doc in documents)
+        logger.info("Converted legacy pickle metadata to JSONL")
+        store.extend(documents)
+        return store
+
+    def _read_index_from_disk(self) -> faiss.Index:
+        """
+        Read the on-disk index, memory-mapping it when possible.
+
+        mmap pages fault in on demand and are shared across workers via
+        the kernel page cache, so startup skips the full copy into RSS.
+        Types that don't support mmap (plain flat indexes) fall back to
+        a normal in-memory read.
+
+        Returns:
+            faiss.Index: Loaded index
+        """
+        try:
+            index = faiss.read_index(
+                self._INDEX_PATH, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            logger.info("Memory-mapped FAISS index from disk")
+            return index
+        except Exception:
+            return faiss.read_index(self._INDEX_PATH)
+
     def _load_index(self) -> None:
         """Load FAISS index and documents from disk if they exist."""
-        index_path = "faiss_index.bin"
-        docs_path = "faiss_documents.pkl"
-        
-        if os.path.exists(index_path) and os.path.exists(docs_path):
+        have_docs = os.path.exists(self._DOCS_PATH) or os.path.exists(self._LEGACY_DOCS_PATH)
+        if os.path.exists(self._INDEX_PATH) and have_docs:
             try:
-                self.index = faiss.read_index(index_path)
-                with open(docs_path, 'rb') as f:
-                    self.documents = pickle.load(f)
-                logger.info(f"Loaded FAISS index with {len(self.documents)} documents")
+                self.index = self._read_index_from_disk()
+                self.documents = self._load_metadata()
+                if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                    self._migrate_l2_index()
+                self._tune_index()
+                self._train_buffer = []
+                if len(self.documents) > self.index.ntotal:
+                    # Metadata is appended per upload but the index only
+                    # snapshots periodically; a crash can leave orphan
+                    # lines whose vectors were lost — drop them
+                    logger.warning(
+                        "Dropping %d metadata entries with no indexed vectors "
+                        "(re-upload those documents)",
+                        len(self.documents) - self.index.ntotal
+                    )
+                    self.documents.truncate(self.index.ntotal)
+                self._snapshot_size = len(self.documents)
+                self._maybe_load_matrix()
+                logger.info("Loaded FAISS index with %d documents", len(self.documents))
             except Exception as e:
-                logger.warning(f"Could not load FAISS index: {e}")
+                logger.warning("Could not load FAISS index: %s", e)
                 self._initialize_index()
         else:
             self._initialize_index()
-    
+
+    def _migrate_l2_index(self) -> None:
+        """
+        Rebuild an old L2 index as inner-product over normalized vectors.
+
+        Flat indexes store the raw vectors, so they can be reconstructed,
+        normalized and re-added without re-embedding anything.
+        """
+        logger.info("Migrating legacy L2 FAISS index to inner-product (cosine)")
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        faiss.normalize_L2(vectors)
+        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index.add(vectors)
+        self._snapshot_index()
+
+    # Flat is exact; HNSW/IVF trade a little recall for sub-linear search
+    # once the corpus outgrows brute force
+    _FACTORY_STRINGS = {
+        "flat": "{q}",
+        "hnsw": "HNSW32,{q}",
+        "ivf": "IVF1024,{q}",
+    }
+
+    # Flat search streams the whole vector matrix per query, so it is
+    # memory-bandwidth-bound: fp16 halves the bytes moved (~2x search
+    # throughput) for negligible recall loss, PQ cuts them ~16x at a
+    # real recall cost. Quantized storage needs a training pass, which
+    # the _add_vectors buffering already provides.
+    _QUANTIZER_STORAGE = {
+        "none": "Flat",
+        "fp16": "SQfp16",
+        "pq": "PQ96",
+    }
+
     def _initialize_index(self) -> None:
-        """Initialize a new FAISS index."""
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.documents = []
-        logger.info("Initialized new FAISS index")
+        """Initialize a new FAISS index of the configured type."""
+        # Inner product over L2-normalized vectors == cosine similarity
+        storage = self._QUANTIZER_STORAGE.get(
+            settings.FAISS_QUANTIZER, self._QUANTIZER_STORAGE["none"]
+        )
+        factory = self._FACTORY_STRINGS.get(
+            settings.FAISS_INDEX_TYPE, self._FACTORY_STRINGS["flat"]
+        ).format(q=storage)
+        self.index = faiss.index_factory(
+            self.dimension, factory, faiss.METRIC_INNER_PRODUCT
+        )
+        self._tune_index()
+        self.documents = _ChunkStore()
+        self._train_buffer = []
+        self._snapshot_size = 0
+        logger.info("Initialized new FAISS index (%s)", factory)
+
+    def _maybe_load_matrix(self) -> None:
+        """Rebuild the small-corpus matrix from a freshly loaded index."""
+        if not 0 < self.index.ntotal < settings.FAISS_MIN_ROWS:
+            return
+        try:
+            self._mat = np.ascontiguousarray(
+                self.index.reconstruct_n(0, self.index.ntotal)
+            )
+        except RuntimeError:
+            # Non-flat storage can't reconstruct exact vectors; the FAISS
+            # path handles these corpora
+            self._mat = None
+
+    def _track_matrix(self, vectors: np.ndarray) -> None:
+        """
+        Grow the small-corpus matrix, dropping it past FAISS_MIN_ROWS.
+
+        Args:
+            vectors: Normalized vectors just added to the index
+        """
+        have = 0 if self._mat is None else self._mat.shape[0]
+        if have + vectors.shape[0] >= settings.FAISS_MIN_ROWS:
+            self._mat = None
+            return
+        if self._mat is None:
+            # Only start tracking from an empty index; a prefix that was
+            # never captured can't be recovered here
+            if self.index.ntotal != vectors.shape[0]:
+                return
+            self._mat = vectors.copy()
+        else:
+            self._mat = np.vstack((self._mat, vectors))
+
+    def _search_matrix(
+        self, query_matrix: np.ndarray, top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Direct cosine search over the contiguous small-corpus matrix.
+
+        For a handful of vectors FAISS's pybind dispatch and index
+        bookkeeping dominate the actual distance math; one SIMD kernel
+        call (simsimd when available, BLAS matmul otherwise) plus an
+        argpartition top-k is cheaper.
+
+        Args:
+            query_matrix: (nq, dimension) normalized query vectors
+            top_k: Number of results per query
+
+        Returns:
+            Tuple of (scores, indices) shaped like index.search output
+        """
+        if _SIMSIMD:
+            sims = 1.0 - np.asarray(
+                simsimd.cdist(query_matrix, self._mat, metric="cosine"),
+                dtype='float32'
+            )
+        else:
+            sims = query_matrix @ self._mat.T
+
+        k = min(top_k, sims.shape[1])
+        rows = np.arange(sims.shape[0])[:, None]
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        order = np.argsort(-sims[rows, top], axis=1)
+        indices = top[rows, order]
+        return sims[rows, indices], indices
+
+    def _maybe_to_gpu(self) -> None:
+        """
+        Move the index to GPU 0 when enabled and a CUDA FAISS build exists.
+
+        The GPU parallelizes both the distance matrix and k-selection,
+        which matters once batched queries hit a large corpus. Searches
+        run against the GPU copy; snapshots copy back to CPU first since
+        write_index only handles CPU indexes.
+        """
+        if not settings.FAISS_USE_GPU:
+            return
+        try:
+            self._gpu_resources = faiss.StandardGpuResources()
+            self.index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self.index)
+            self._on_gpu = True
+            logger.info("Moved FAISS index to GPU 0")
+        except AttributeError:
+            logger.warning(
+                "FAISS_USE_GPU is set but this FAISS build has no GPU support; "
+                "staying on CPU"
+            )
+        except Exception as e:
+            logger.warning("Could not move FAISS index to GPU: %s", e)
+
+    def _tune_index(self) -> None:
+        """Apply query-time tuning knobs where the index type supports them."""
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = settings.FAISS_NPROBE
+
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        """
+        Add vectors to the index, buffering until training if needed.
+
+        IVF and quantized indexes need a representative training sample
+        before they can accept vectors; until enough are buffered the
+        index stays empty (searches return no results) and everything is
+        added in order once training runs, keeping positions aligned
+        with documents.
+
+        Args:
+            vectors: (N, dimension) float32 matrix of normalized vectors
+        """
+        if self.index.is_trained:
+            try:
+                self.index.add(vectors)
+            except RuntimeError:
+                # An mmap-loaded index is read-only; swap in a writable
+                # in-memory copy the first time indexing is needed
+                logger.info("Index is memory-mapped read-only; reloading writable copy")
+                self.index = faiss.read_index(self._INDEX_PATH)
+                self._tune_index()
+                self._maybe_to_gpu()
+                self.index.add(vectors)
+            self._track_matrix(vectors)
+            return
+
+        self._train_buffer.append(vectors)
+        buffered = sum(v.shape[0] for v in self._train_buffer)
+        if buffered < settings.FAISS_IVF_TRAIN_SIZE:
+            logger.info(
+                "Buffered %d vectors awaiting index training (need %d)",
+                buffered, settings.FAISS_IVF_TRAIN_SIZE
+            )
+            return
+
+        training_matrix = np.vstack(self._train_buffer)
+        self.index.train(training_matrix)
+        self.index.add(training_matrix)
+        self._track_matrix(training_matrix)
+        self._train_buffer = []
+        logger.info("Trained index on %d vectors", buffered)
     
-    def _save_index(self) -> None:
-        """Save FAISS index and documents to disk."""
+    def _snapshot_index(self) -> None:
+        """Write the FAISS index to disk atomically (write temp, rename)."""
         try:
-            faiss.write_index(self.index, "faiss_index.bin")
-            with open("faiss_documents.pkl", 'wb') as f:
-                pickle.dump(self.documents, f)
-            logger.info("Saved FAISS index to disk")
+            index = faiss.index_gpu_to_cpu(self.index) if self._on_gpu else self.index
+            tmp_path = self._INDEX_PATH + ".tmp"
+            faiss.write_index(index, tmp_path)
+            os.replace(tmp_path, self._INDEX_PATH)
+            self._snapshot_size = len(self.documents)
+            logger.info("Saved FAISS index snapshot to disk")
         except Exception as e:
-            logger.error(f"Error saving FAISS index: {e}")
+            logger.error("Error saving FAISS index: %s", e)
+
+    def _append_metadata(self, chunks: List[dict]) -> None:
+        """
+        Append newly indexed chunk metadata to the JSONL store.
+
+        O(new chunks) per upload instead of re-pickling the whole corpus.
+
+        Args:
+            chunks: Metadata dicts for the chunks just added
+        """
+        try:
+            with open(self._DOCS_PATH, 'ab') as f:
+                f.writelines(orjson.dumps(chunk) + b"\n" for chunk in chunks)
+        except Exception as e:
+            logger.error("Error appending index metadata: %s", e)
+
+    def _maybe_snapshot(self) -> None:
+        """Snapshot the index once enough chunks accumulated since the last one."""
+        if len(self.documents) - self._snapshot_size >= settings.FAISS_SNAPSHOT_EVERY:
+            self._snapshot_index()
     
     def _get_embedding(self, text: str) -> np.ndarray:
         """
@@ -84,20 +475,165 @@ class RAGService:
             np.ndarray: Embedding vector
         """
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/embeddings",
+            response = self._http.post(
+                "/api/embeddings",
                 json={
                     "model": self.embedding_model,
                     "prompt": text
                 }
             )
             response.raise_for_status()
-            embedding = np.array(response.json()["embedding"], dtype='float32')
-            return embedding
+            embedding = np.array(
+                orjson.loads(response.content)["embedding"], dtype='float32'
+            ).reshape(1, -1)
+            faiss.normalize_L2(embedding)
+            return embedding[0]
         except Exception as e:
-            logger.error(f"Error getting embedding from Ollama: {e}")
+            logger.error("Error getting embedding from Ollama: %s", e)
             raise
-    
+
+    def _get_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Get embedding vectors for a batch of texts in one Ollama call.
+
+        A single POST to /api/embed amortizes HTTP round-trip and model
+        setup cost over the whole batch instead of paying it per chunk.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: (len(texts), dimension) float32 embedding matrix
+        """
+        try:
+            response = self._http.post(
+                "/api/embed",
+                json={
+                    "model": self.embedding_model,
+                    "input": texts
+                }
+            )
+            response.raise_for_status()
+            # orjson's SIMD parser matters here: a batched /api/embed
+            # response is several MB of numeric JSON
+            embeddings = np.ascontiguousarray(
+                np.asarray(orjson.loads(response.content)["embeddings"], dtype='float32')
+            )
+            faiss.normalize_L2(embeddings)
+            return embeddings
+        except httpx.HTTPStatusError as e:
+            # Older Ollama builds don't ship /api/embed and answer 404
+            # (or 405); fall back to parallel per-text requests so
+            # indexing still succeeds
+            if e.response.status_code in (404, 405):
+                logger.warning(
+                    "Ollama has no /api/embed endpoint; falling back to "
+                    "parallel per-text embedding requests"
+                )
+                return self._get_embeddings_parallel(texts)
+            logger.error("Error getting batch embeddings from Ollama: %s", e)
+            raise
+        except KeyError:
+            # Belt and braces: a 200 response without an 'embeddings'
+            # field still routes to the per-text path
+            logger.warning(
+                "Ollama /api/embed returned no 'embeddings' field; "
+                "falling back to parallel per-text embedding requests"
+            )
+            return self._get_embeddings_parallel(texts)
+        except Exception as e:
+            logger.error("Error getting batch embeddings from Ollama: %s", e)
+            raise
+
+    def _get_embeddings_parallel(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with bounded-concurrency per-text requests.
+
+        Fallback for Ollama builds without /api/embed: overlaps the
+        network round trips of N /api/embeddings calls instead of paying
+        them serially, capped by settings.OLLAMA_MAX_CONCURRENCY. Runs
+        its own event loop, so it must be called from a worker thread,
+        never from the application loop.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: (len(texts), dimension) float32 embedding matrix
+        """
+        async def _run() -> List[List[float]]:
+            semaphore = asyncio.Semaphore(settings.OLLAMA_MAX_CONCURRENCY)
+            async with httpx.AsyncClient(
+                base_url=self.ollama_url,
+                http2=True,
+                timeout=httpx.Timeout(300.0, connect=10.0)
+            ) as client:
+                async def _one(text: str) -> List[float]:
+                    async with semaphore:
+                        response = await client.post(
+                            "/api/embeddings",
+                            json={"model": self.embedding_model, "prompt": text}
+                        )
+                        response.raise_for_status()
+                        return orjson.loads(response.content)["embedding"]
+
+                # gather preserves input order
+                return await asyncio.gather(*(_one(text) for text in texts))
+
+        embeddings = np.ascontiguousarray(
+            np.asarray(asyncio.run(_run()), dtype='float32')
+        )
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _embedding_cache_path(self, chunk_hash: str) -> str:
+        """Return the cache file path for a chunk content hash."""
+        return os.path.join(self._embedding_cache_dir, chunk_hash + ".npy")
+
+    def _get_embeddings_cached(self, chunks: List[str]) -> np.ndarray:
+        """
+        Embed chunks through the content-hash cache.
+
+        Real corpora repeat chunk strings (boilerplate headers, licenses,
+        re-uploaded drafts); each duplicate would otherwise pay a full
+        Ollama round-trip. Chunks are keyed by blake2b of their content,
+        only misses go to the network, and the result matrix is assembled
+        in the original order.
+
+        Args:
+            chunks: Chunk texts to embed
+
+        Returns:
+            np.ndarray: (len(chunks), dimension) float32 embedding matrix
+        """
+        hashes = [
+            hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+            for chunk in chunks
+        ]
+        embeddings = np.empty((len(chunks), self.dimension), dtype='float32')
+
+        miss_idx = []
+        for i, chunk_hash in enumerate(hashes):
+            try:
+                embeddings[i] = np.load(self._embedding_cache_path(chunk_hash))
+            except (OSError, ValueError):
+                miss_idx.append(i)
+
+        if miss_idx:
+            fresh = self._get_embeddings_batch([chunks[i] for i in miss_idx])
+            for row, i in enumerate(miss_idx):
+                embeddings[i] = fresh[row]
+                try:
+                    np.save(self._embedding_cache_path(hashes[i]), fresh[row])
+                except OSError as e:
+                    logger.warning("Could not write embedding cache entry: %s", e)
+
+        logger.info(
+            "Embedded %d chunks, %d served from embedding cache",
+            len(miss_idx), len(chunks) - len(miss_idx)
+        )
+        return embeddings
+
     def index_document(self, document_id: int, filename: str, content: str) -> str:
         """
         Index a document by chunking and creating embeddings.
@@ -110,35 +646,42 @@ class RAGService:
         Returns:
             str: Embedding ID (for reference)
         """
-        logger.info(f"Indexing document: {filename} (ID: {document_id})")
+        logger.info("Indexing document: %s (ID: %d)", filename, document_id)
         
         # Split document into chunks
-        chunks = self.text_splitter.split_text(content)
-        logger.info(f"Split document into {len(chunks)} chunks")
+        chunks = split_text(content)
+        logger.debug("Split document into %d chunks", len(chunks))
         
-        # Create embeddings for each chunk
-        embeddings = []
-        for i, chunk in enumerate(chunks):
-            embedding = self._get_embedding(chunk)
-            embeddings.append(embedding)
-            
-            # Store chunk metadata
-            self.documents.append({
+        # Embed all chunks in one batched call, deduplicated through the
+        # content-hash cache
+        embeddings_array = self._get_embeddings_cached(chunks)
+
+        # Store chunk metadata
+        new_chunks = [
+            {
                 "document_id": document_id,
                 "filename": filename,
                 "chunk_index": i,
                 "content": chunk
-            })
-        
-        # Add embeddings to FAISS index
-        embeddings_array = np.array(embeddings, dtype='float32')
-        self.index.add(embeddings_array)
-        
-        # Save index
-        self._save_index()
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+        # Metadata and vectors must land in lockstep or FAISS positions
+        # drift from chunk rows, so the whole mutation is one critical
+        # section (embedding above stays outside the lock)
+        with self._index_lock:
+            self.documents.extend(new_chunks)
+
+            # Add embeddings to FAISS index
+            self._add_vectors(embeddings_array)
+
+            # Persist: append only the new metadata, snapshot the binary
+            # index at most every FAISS_SNAPSHOT_EVERY chunks
+            self._append_metadata(new_chunks)
+            self._maybe_snapshot()
         
         embedding_id = f"doc_{document_id}_{len(chunks)}_chunks"
-        logger.info(f"Successfully indexed document: {embedding_id}")
+        logger.info("Successfully indexed document: %s", embedding_id)
         
         return embedding_id
     
@@ -164,43 +707,103 @@ class RAGService:
         query_embedding = self._get_embedding(query)
         query_vector = np.array([query_embedding], dtype='float32')
         
-        # Search FAISS index
-        distances, indices = self.index.search(query_vector, min(top_k, self.index.ntotal))
-        
-        # Prepare results with similarity scores
-        results = []
-        for distance, idx in zip(distances[0], indices[0]):
-            if idx < len(self.documents):
-                # Convert L2 distance to similarity score (inverse)
-                similarity = 1 / (1 + distance)
-                results.append((self.documents[idx], float(similarity)))
-        
-        logger.info(f"Found {len(results)} similar chunks for query")
+        # Tiny corpora skip FAISS entirely; one SIMD pass over the
+        # contiguous matrix beats the per-call index overhead. The lock
+        # keeps the search away from a concurrent background index.add
+        with self._index_lock:
+            if self._mat is not None:
+                scores, indices = self._search_matrix(query_vector, top_k)
+            else:
+                scores, indices = self.index.search(
+                    query_vector, min(top_k, self.index.ntotal)
+                )
+            results = self._rows_to_results(scores[0], indices[0])
+        logger.debug("Found %d similar chunks for query", len(results))
         return results
-    
-    def get_context_for_query(self, query: str) -> Tuple[str, List[dict]]:
+
+    def _rows_to_results(
+        self, row_scores: np.ndarray, row_indices: np.ndarray
+    ) -> List[Tuple[dict, float]]:
         """
-        Get relevant context for a query by retrieving similar documents.
-        
+        Turn one search result row into (chunk, score) pairs.
+
+        Masking, clamping and list conversion all run as vectorized NumPy
+        ops; Python-level work is limited to materializing the top-k rows.
+        Inner product of unit vectors is cosine similarity; the clamp to
+        [0, 1] absorbs float rounding on the schema bounds.
+
         Args:
-            query: User query
-            
+            row_scores: Similarity scores for one query
+            row_indices: Matching index positions for one query
+
+        Returns:
+            List of (chunk_data, similarity_score) tuples
+        """
+        mask = (row_indices >= 0) & (row_indices < len(self.documents))
+        valid = row_indices[mask]
+        clamped = np.clip(row_scores[mask], 0.0, 1.0)
+        return list(zip(self.documents.take(valid.tolist()), clamped.tolist()))
+
+    def search_similar_batch(
+        self, queries: List[str], top_k: int = None
+    ) -> List[List[Tuple[dict, float]]]:
+        """
+        Search similar chunks for several queries in one FAISS call.
+
+        Embeds all queries in one Ollama request and passes the matrix to
+        a single index.search, letting FAISS run its batched SIMD path.
+
+        Args:
+            queries: Search queries
+            top_k: Number of results per query (default from settings)
+
+        Returns:
+            One result list per query, same order as the input
+        """
+        if top_k is None:
+            top_k = settings.TOP_K_RESULTS
+
+        if self.index.ntotal == 0:
+            logger.warning("FAISS index is empty, no documents to search")
+            return [[] for _ in queries]
+
+        query_matrix = self._get_embeddings_batch(queries)
+        with self._index_lock:
+            if self._mat is not None:
+                scores, indices = self._search_matrix(query_matrix, top_k)
+            else:
+                scores, indices = self.index.search(
+                    query_matrix, min(top_k, self.index.ntotal)
+                )
+            all_results = [
+                self._rows_to_results(row_scores, row_indices)
+                for row_scores, row_indices in zip(scores, indices)
+            ]
+
+        logger.debug("Batched FAISS search for %d queries", len(queries))
+        return all_results
+
+    @staticmethod
+    def _build_context(similar_chunks: List[Tuple[dict, float]]) -> Tuple[str, List[dict]]:
+        """
+        Build context text and unique source list from search results.
+
+        Args:
+            similar_chunks: List of (chunk_data, similarity_score) tuples
+
         Returns:
             Tuple of (context_text, source_documents)
         """
-        similar_chunks = self.search_similar(query)
-        
         if not similar_chunks:
             return "", []
-        
-        # Build context from chunks
+
         context_parts = []
         sources = []
         seen_docs = set()
-        
+
         for chunk_data, score in similar_chunks:
             context_parts.append(chunk_data["content"])
-            
+
             # Track unique source documents
             doc_id = chunk_data["document_id"]
             if doc_id not in seen_docs:
@@ -210,10 +813,95 @@ class RAGService:
                     "relevance_score": score
                 })
                 seen_docs.add(doc_id)
-        
+
         context = "\n\n---\n\n".join(context_parts)
         return context, sources
 
+    def get_context_for_query(self, query: str) -> Tuple[str, List[dict]]:
+        """
+        Get relevant context for a query by retrieving similar documents.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Tuple of (context_text, source_documents)
+        """
+        return self._build_context(self.search_similar(query))
+
+    def get_context_for_queries(self, queries: List[str]) -> List[Tuple[str, List[dict]]]:
+        """
+        Get relevant context for several queries via one batched search.
+
+        Args:
+            queries: User queries
+
+        Returns:
+            List of (context_text, source_documents), same order as input
+        """
+        return [
+            self._build_context(chunks)
+            for chunks in self.search_similar_batch(queries)
+        ]
+
+    async def get_context_batched(self, query: str) -> Tuple[str, List[dict]]:
+        """
+        Get retrieval context for a query through the micro-batcher.
+
+        Enqueues the query and awaits its future; the background worker
+        coalesces queries that arrive close together into a single
+        batched embed + FAISS search, so every async caller benefits
+        without managing its own batching.
+
+        Args:
+            query: User query
+
+        Returns:
+            Tuple of (context_text, source_documents)
+        """
+        if self._batch_queue is None:
+            self._batch_queue = asyncio.Queue()
+            self._batcher_task = asyncio.create_task(self._batch_worker())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((query, future))
+        return await future
+
+    async def _batch_worker(self) -> None:
+        """
+        Background worker that drains the retrieval queue in small batches.
+
+        Blocks on the first query, then waits a short window and collects
+        whatever else arrived before running one batched retrieval for all.
+        """
+        while True:
+            batch = [await self._batch_queue.get()]
+
+            # Give concurrent requests a brief chance to join the batch
+            await asyncio.sleep(self._MAX_BATCH_WAIT)
+            while len(batch) < self._MAX_BATCH_SIZE:
+                try:
+                    batch.append(self._batch_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            queries = [query for query, _ in batch]
+            try:
+                results = await asyncio.to_thread(
+                    self.get_context_for_queries, queries
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.info("Coalesced %d retrievals into one batch", len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
 
 # Singleton instance
 _rag_service_instance: Optional[RAGService] = None
@@ -230,3 +918,9 @@ def get_rag_service() -> RAGService:
     if _rag_service_instance is None:
         _rag_service_instance = RAGService()
     return _rag_service_instance
+
+
+def close_rag_service() -> None:
+    """Close the singleton's HTTP pool if the service was ever created."""
+    if _rag_service_instance is not None:
+        _rag_service_instance.close()
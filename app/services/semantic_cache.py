@@ -0,0 +1,197 @@
+"""
+Semantic Cache Service
+Redis-backed semantic response cache using RediSearch vector similarity (HNSW).
+"""
+
+import hashlib
+from typing import Optional
+
+import httpx
+import numpy as np
+import redis
+from redis.commands.search.field import TextField, VectorField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+
+class SemanticCache:
+    """
+    Semantic response cache keyed by prompt embeddings.
+
+    Instead of exact string matching, cached responses are retrieved via
+    KNN search over prompt embeddings stored in a RediSearch HNSW index.
+    Near-duplicate prompts (cosine similarity above the threshold) are
+    served from Redis in milliseconds instead of paying full LLM latency.
+    """
+
+    INDEX_NAME = "idx:semantic_cache"
+    KEY_PREFIX = "cache:"
+
+    def __init__(self, similarity_threshold: float = 0.92):
+        """
+        Initialize semantic cache with Redis connection and vector index.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a cache hit
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ollama_url = settings.OLLAMA_BASE_URL
+        self.embedding_model = settings.OLLAMA_EMBEDDING_MODEL
+        self.dimension = 768  # nomic-embed-text dimension
+
+        # Persistent client reuses keep-alive connections across lookups
+        self._http = httpx.Client(
+            base_url=self.ollama_url,
+            timeout=httpx.Timeout(300.0, connect=10.0)
+        )
+
+        self.redis_client: Optional[redis.Redis] = None
+        if settings.REDIS_ENABLED:
+            try:
+                # decode_responses=False: embedding field holds raw bytes
+                self.redis_client = redis.Redis(
+                    host=settings.REDIS_HOST,
+                    port=settings.REDIS_PORT,
+                    db=settings.REDIS_DB,
+                    decode_responses=False
+                )
+                self.redis_client.ping()
+                self._ensure_index()
+                logger.info("Connected to Redis semantic cache")
+            except Exception as e:
+                logger.warning(f"Semantic cache unavailable: {e}. Caching disabled.")
+                self.redis_client = None
+
+    def _ensure_index(self) -> None:
+        """Create the RediSearch vector index if it does not exist yet."""
+        try:
+            self.redis_client.ft(self.INDEX_NAME).info()
+        except redis.ResponseError:
+            schema = (
+                TextField("prompt"),
+                TextField("response"),
+                VectorField(
+                    "embedding",
+                    "HNSW",
+                    {
+                        "TYPE": "INT8",
+                        "DIM": self.dimension,
+                        "DISTANCE_METRIC": "COSINE",
+                    }
+                ),
+            )
+            definition = IndexDefinition(
+                prefix=[self.KEY_PREFIX],
+                index_type=IndexType.HASH
+            )
+            self.redis_client.ft(self.INDEX_NAME).create_index(
+                schema, definition=definition
+            )
+            logger.info("Created semantic cache index")
+
+    def _get_embedding(self, text: str) -> np.ndarray:
+        """
+        Get embedding vector for text using Ollama API.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            np.ndarray: Embedding vector (float32)
+        """
+        response = self._http.post(
+            "/api/embeddings",
+            json={
+                "model": self.embedding_model,
+                "prompt": text
+            }
+        )
+        response.raise_for_status()
+        return np.array(response.json()["embedding"], dtype='float32')
+
+    @staticmethod
+    def _quantize(embedding: np.ndarray) -> tuple:
+        """
+        Quantize a float32 embedding to INT8 for compact storage.
+
+        Cosine distance is scale-invariant, so symmetric per-vector scaling
+        preserves ranking while cutting memory 4x and speeding KNN distances.
+
+        Args:
+            embedding: Float32 embedding vector
+
+        Returns:
+            Tuple of (int8 vector, float scale factor)
+        """
+        scale = float(np.max(np.abs(embedding))) or 1.0
+        quantized = np.clip(
+            np.round(embedding / scale * 127), -128, 127
+        ).astype(np.int8)
+        return quantized, scale
+
+    def get(self, prompt: str) -> Optional[str]:
+        """
+        Look up a cached response for a semantically similar prompt.
+
+        Args:
+            prompt: User prompt
+
+        Returns:
+            str: Cached response, or None on miss
+        """
+        if not self.redis_client:
+            return None
+
+        try:
+            embedding, _ = self._quantize(self._get_embedding(prompt))
+            query = (
+                Query("*=>[KNN 1 @embedding $vec AS score]")
+                .return_fields("response", "score")
+                .dialect(2)
+            )
+            results = self.redis_client.ft(self.INDEX_NAME).search(
+                query, query_params={"vec": embedding.tobytes()}
+            )
+
+            if results.docs:
+                doc = results.docs[0]
+                # RediSearch returns cosine *distance*; convert to similarity
+                similarity = 1.0 - float(doc.score)
+                if similarity >= self.similarity_threshold:
+                    logger.info(f"Semantic cache hit (similarity={similarity:.3f})")
+                    response = doc.response
+                    return response.decode() if isinstance(response, bytes) else response
+        except Exception as e:
+            logger.error(f"Error reading from semantic cache: {e}")
+
+        return None
+
+    def set(self, prompt: str, response: str) -> None:
+        """
+        Cache a response keyed by the prompt embedding.
+
+        Args:
+            prompt: User prompt
+            response: Generated response to cache
+        """
+        if not self.redis_client:
+            return
+
+        try:
+            embedding, scale = self._quantize(self._get_embedding(prompt))
+            fingerprint = hashlib.md5(prompt.encode()).hexdigest()
+            key = f"{self.KEY_PREFIX}{fingerprint}"
+
+            self.redis_client.hset(key, mapping={
+                "prompt": prompt,
+                "response": response,
+                "embedding": embedding.tobytes(),
+                "scale": scale  # kept for exact FP32 re-ranking if ever needed
+            })
+            self.redis_client.expire(key, settings.CACHE_TTL)
+            logger.info(f"Cached response for prompt: {prompt[:50]}...")
+        except Exception as e:
+            logger.error(f"Error writing to semantic cache: {e}")
@@ -3,8 +3,11 @@ Logging Configuration
 Centralized logging setup for the application.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 from app.core.config import settings
@@ -40,8 +43,16 @@ def setup_logger(name: str = "ai_knowledge_assistant") -> logging.Logger:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
+
+    # Hand records off through a queue so formatting and stdout writes
+    # happen on the listener's background thread, never blocking the
+    # event loop on console I/O
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
     
     return logger
 